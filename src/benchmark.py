@@ -0,0 +1,391 @@
+"""
+End-to-end benchmarks of the match segmentation pipeline.
+
+Every stage (loading, preprocessing, graph building, metrics, distances, drift detection and DSDD)
+runs on fixed synthetic inputs (src.concept_drift.syntethic_graphs, fixed seed) at several sizes.
+Results are written as JSON so runs can be compared across commits:
+
+    python -m src.benchmark --sizes small medium --output bench/HEAD.json --compare bench/main.json
+
+A stage whose optional dependencies are missing is reported as skipped. With --compare, stages whose
+median time grew more than --threshold (relative) are reported as regressions and the exit code is 1.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from src.concept_drift.syntethic_graphs import generate_synthetic_graph_stream, generate_synthetic_tracking
+
+SIZES = {
+    'small': dict(duration=120, n_frames=100, n_matches=3, n_intervals=20, dsdd_series=1, dsdd_intervals=165, repeat=5),
+    'medium': dict(duration=600, n_frames=500, n_matches=6, n_intervals=45, dsdd_series=2, dsdd_intervals=300, repeat=3),
+    'large': dict(duration=5400, n_frames=2000, n_matches=20, n_intervals=90, dsdd_series=4, dsdd_intervals=600, repeat=1),
+}
+
+SEED = 0
+
+STAGES = {}
+
+
+def stage(name):
+    """Registers a benchmark stage: a function (inputs) -> callable timed with no arguments."""
+    def decorator(function):
+        STAGES[name] = function
+        return function
+    return decorator
+
+
+class Inputs:
+    """Synthetic inputs of one size, built lazily and shared by all stages."""
+
+    def __init__(self, size):
+        self.size = size
+        self.params = SIZES[size]
+        self._cache = {}
+        self._tempdirs = []
+
+    def _get(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    def tempdir(self):
+        """Temporary folder, removed by cleanup() once every stage of this size has run."""
+        folder = tempfile.TemporaryDirectory(prefix='benchmark_')
+        self._tempdirs.append(folder)
+        return folder.name
+
+    def cleanup(self):
+        for folder in self._tempdirs:
+            folder.cleanup()
+        self._tempdirs.clear()
+
+    @property
+    def tracking(self):
+        return self._get('tracking', lambda: generate_synthetic_tracking(
+            match_id=1, duration=self.params['duration'], seed=SEED
+        ))
+
+    @property
+    def graph_list(self):
+        return self._get('graph_list', lambda: generate_synthetic_graph_stream(
+            n_matches=self.params['n_matches'], n_intervals=self.params['n_intervals'], seed=SEED
+        )[0])
+
+    @property
+    def graphs(self):
+        return [item['graph'] for item in self.graph_list]
+
+    @property
+    def dsdd_streams(self):
+        """One graph stream per (match, team) series, long enough for DSDD to produce change scores."""
+        def build():
+            graph_list, _ = generate_synthetic_graph_stream(
+                n_matches=-(-self.params['dsdd_series'] // 2), n_intervals=self.params['dsdd_intervals'], seed=SEED
+            )
+            streams = {}
+            for item in graph_list:
+                streams.setdefault((item['match_id'], item['team_id']), []).append(item['graph'])
+            return list(streams.values())[:self.params['dsdd_series']]
+        return self._get('dsdd_streams', build)
+
+    @property
+    def frame_args(self):
+        """interval_to_graph arguments of the first n_frames frames, as GraphStream._get_args builds them."""
+        def build():
+            metadata_df, players_df, _ = self.tracking
+            merged_df = pd.merge(
+                players_df,
+                metadata_df[['frame_id', 'match_id', 'possession_id', 'home_has_possession']],
+                on=['frame_id', 'match_id'],
+                how='left',
+            )
+            frame_ids = merged_df['frame_id'].unique()[:self.params['n_frames']]
+            merged_df = merged_df[merged_df['frame_id'].isin(frame_ids)]
+            return [(frame_id, group, False) for frame_id, group in merged_df.groupby('frame_id', sort=False)]
+        return self._get('frame_args', build)
+
+    @property
+    def metric_series(self):
+        def build():
+            from src.pass_networks.custom_metrics import calculate_modularity
+            return pd.DataFrame([
+                {'match_id': item['match_id'], 'team_id': item['team_id'],
+                 'modularity': calculate_modularity(item['graph'])}
+                for item in self.graph_list
+            ])
+        return self._get('metric_series', build)
+
+
+@stage('loading')
+def bench_loading(inputs):
+    from src.pass_networks.process_intervals import load_graphs, save_graphs
+
+    folder = inputs.tempdir()
+    save_graphs('synthetic', folder, inputs.graph_list)
+    return partial(load_graphs, 'synthetic', folder)
+
+
+@stage('preprocessing')
+def bench_preprocessing(inputs):
+    from src.data.process_game import filter_invalid_frames, reduce_frame_rate, remove_set_pieces
+
+    metadata_df = inputs.tracking[0]
+
+    def run():
+        df = filter_invalid_frames(metadata_df.copy())
+        df = remove_set_pieces(df)
+        return reduce_frame_rate(df, target_fps=5, original_fps=30)
+    return run
+
+
+@stage('graph_building')
+def bench_graph_building(inputs):
+    from src.data.process_graphs import interval_to_graph
+
+    args = inputs.frame_args
+    return lambda: [interval_to_graph(arg) for arg in args]
+
+
+@stage('graph_building_knn')
+def bench_graph_building_knn(inputs):
+    from src.data.process_graphs import interval_to_graph
+
+    args = [arg + ('knn', None) for arg in inputs.frame_args]
+    return lambda: [interval_to_graph(arg) for arg in args]
+
+
+@stage('pass_networks')
+def bench_pass_networks(inputs):
+    from src.concept_drift.syntethic_graphs import generate_synthetic_pass_networks
+    from src.pass_networks.process_intervals import get_interval_graphs
+
+    passes_df, positions_df, _ = generate_synthetic_pass_networks(
+        n_intervals=inputs.params['n_intervals'], seed=SEED
+    )
+    return partial(get_interval_graphs, passes_df, positions_df)
+
+
+@stage('metrics')
+def bench_metrics(inputs):
+    import networkx as nx
+    from src.pass_networks.custom_metrics import calculate_modularity
+    from src.pass_networks.pass_network import calculate_metrics
+
+    metrics = {
+        'density': nx.density,
+        'clustering': partial(nx.average_clustering, weight='weight'),
+        'modularity': calculate_modularity,
+    }
+    graphs = inputs.graphs
+    return lambda: [calculate_metrics(G, metrics) for G in graphs]
+
+
+@stage('distances')
+def bench_distances(inputs):
+    from src.pass_networks.custom_metrics import calculate_graph_distance_stream
+
+    graphs = inputs.graphs
+    return partial(calculate_graph_distance_stream, graphs, 'Wasserstein')
+
+
+@stage('drift_detection')
+def bench_drift_detection(inputs):
+    from src.concept_drift.drift_points import detect_drift_batch
+
+    series = inputs.metric_series
+    return partial(detect_drift_batch, series, detector='kswin_numpy', by=['match_id', 'team_id'],
+                   value='modularity', num_workers=1, a=0.01, ws=10, ss=3, seed=42)
+
+
+@stage('change_detection')
+def bench_change_detection(inputs):
+    from src.dsdd.change_detection import OnlineChangeDetection
+    from src.dsdd.properties import RULSIF
+
+    values = inputs.metric_series['modularity'].to_numpy()
+
+    def run():
+        detector = OnlineChangeDetection(RULSIF.n, RULSIF.k, RULSIF.alpha, RULSIF.k_fold, RULSIF.refresh)
+        scores = []
+        for value in values:
+            detector.update(value)
+            if detector.is_ready():
+                scores.append(detector.score())
+        return scores
+    return run
+
+
+@stage('dsdd')
+def bench_dsdd(inputs):
+    from src.dsdd.dsdd import DriftDetector
+    from src.dsdd.properties import RULSIF, Experiment
+
+    streams = inputs.dsdd_streams
+    # first change score after param_w graphs fill the window and 2n + k - 1 entropies the buffer
+    needed = Experiment.param_w + 2 * RULSIF.n + RULSIF.k
+    if min(len(graphs) for graphs in streams) < needed:
+        raise ValueError(f"DSDD streams need at least {needed} graphs to reach the change scores.")
+
+    def run():
+        events = []
+        for graphs in streams:
+            with DriftDetector() as detector:
+                events += list(detector.detect_stream(graphs, Experiment.param_n, Experiment.param_w))
+        return events
+    return run
+
+
+def time_stage(setup, inputs, repeat, warmup=1):
+    """Builds the stage once and times `repeat` runs of it after `warmup` untimed runs."""
+    # progress bars and messages of the pipeline are hidden while timing
+    with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+        run = setup(inputs)
+        for _ in range(warmup):
+            run()
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+    return {
+        'repeat': repeat,
+        'warmup': warmup,
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.fmean(times),
+        'stdev': statistics.stdev(times) if repeat > 1 else 0.0,
+    }
+
+
+def run_benchmarks(sizes=('small',), stages=None, repeat=None, warmup=1, verbose=True):
+    """
+    Runs the benchmark stages on the synthetic inputs of each size.
+
+    :param sizes: Names in SIZES.
+    :param stages: Names in STAGES (default: all).
+    :param repeat: Timed runs per stage (default: the repeat of each size).
+    :param warmup: Untimed runs before timing.
+    :return: {size: {stage: timings or {'skipped': reason}}}
+    """
+    stages = list(STAGES) if stages is None else stages
+    results = {}
+    for size in sizes:
+        inputs = Inputs(size)
+        results[size] = {}
+        try:
+            for name in stages:
+                try:
+                    result = time_stage(STAGES[name], inputs, repeat or inputs.params['repeat'], warmup)
+                except ImportError as e:
+                    result = {'skipped': str(e)}
+                results[size][name] = result
+                if verbose:
+                    summary = f"{result['median']:.4f}s" if 'median' in result else f"skipped ({result['skipped']})"
+                    print(f"{size:>8} {name:<18} {summary}", file=sys.stderr)
+        finally:
+            inputs.cleanup()
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(results, path):
+    """Writes the results with the commit, date and environment to a JSON file."""
+    report = {
+        'commit': git_commit(),
+        'date': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'results': results,
+    }
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def compare_results(results, baseline, threshold=0.2):
+    """
+    Compares median times with a baseline report.
+
+    :param results: Output of run_benchmarks.
+    :param baseline: Report dict written by save_results (or its 'results').
+    :param threshold: Relative slowdown above which a stage is a regression.
+    :return: DataFrame with size, stage, baseline, current, ratio and regression, one row per stage
+             timed in both runs.
+    """
+    baseline = baseline.get('results', baseline)
+    rows = []
+    for size, stages in results.items():
+        for name, current in stages.items():
+            previous = baseline.get(size, {}).get(name, {})
+            if 'median' not in current or 'median' not in previous:
+                continue
+            ratio = current['median'] / previous['median'] if previous['median'] > 0 else np.inf
+            rows.append({
+                'size': size,
+                'stage': name,
+                'baseline': previous['median'],
+                'current': current['median'],
+                'ratio': ratio,
+                'regression': ratio > 1 + threshold,
+            })
+    return pd.DataFrame(rows, columns=['size', 'stage', 'baseline', 'current', 'ratio', 'regression'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks of the match segmentation pipeline.')
+    parser.add_argument('--sizes', nargs='+', default=['small'], choices=list(SIZES))
+    parser.add_argument('--stages', nargs='+', default=None, choices=list(STAGES))
+    parser.add_argument('--repeat', type=int, default=None)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--output', default=None, help='JSON file for the results.')
+    parser.add_argument('--compare', default=None, help='Baseline JSON file.')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.stages, args.repeat, args.warmup)
+    if args.output:
+        save_results(results, args.output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        comparison = compare_results(results, baseline, args.threshold)
+        print(comparison.to_string(index=False))
+        if comparison['regression'].any():
+            print('Regressions: ' + ', '.join(
+                f"{row.size}/{row.stage} ({row.ratio:.2f}x)" for row in comparison[comparison['regression']].itertuples()
+            ), file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
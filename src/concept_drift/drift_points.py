@@ -1,4 +1,11 @@
 from river import drift
+from multiprocessing import Pool, cpu_count
+from functools import lru_cache
+import random
+import warnings
+import numpy as np
+import pandas as pd
+from scipy import stats
 
 def detect_kswin_drift(metric_series, a=0.01,ws=10,ss=3,seed=42):
     """
@@ -34,4 +41,115 @@ def detect_adwin_drift(stream, d=0.002,c=32,mb=5,mwl=5,gp=10):
             drifts.append(i)
             #adwin.reset()
 
-    return drifts
\ No newline at end of file
+    return drifts
+
+
+@lru_cache(maxsize=None)
+def _ks_pvalues(n):
+    """
+    p-valores do teste KS de duas amostras de tamanho n para D = k/n, k = 0..n.
+    Sem empates o p-valor exato depende apenas de D e dos tamanhos das amostras.
+    """
+    base = np.arange(n, dtype=float)
+    # ks_2samp avisa quando troca para o método assintótico, como no river
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        return np.array([stats.ks_2samp(base, base + k, method="auto").pvalue for k in range(n + 1)])
+
+
+def detect_kswin_drift_numpy(metric_series, a=0.01, ws=10, ss=3, seed=42, block_size=256):
+    """
+    Implementação vetorizada do KSWIN, com os mesmos pontos de drift de `detect_kswin_drift`.
+
+    Entre dois drifts as janelas deslizantes de todas as posições são testadas de uma vez:
+    a estatística KS é calculada por contagens vetorizadas e o p-valor vem de uma tabela
+    pré-calculada. As amostras aleatórias seguem a mesma sequência do river (random.Random(seed),
+    reiniciado após cada drift).
+    """
+    if ws < ss:
+        raise ValueError("stat_size must be smaller than window_size.")
+
+    x = np.asarray(metric_series, dtype=float)
+    n = len(x)
+    pvalues = _ks_pvalues(ss)
+
+    drift_points = []
+    start = 0
+    while start + ws - 1 < n:
+        rng = random.Random(seed)
+        t0 = start + ws - 1
+        detected = None
+
+        for block in range(t0, n, block_size):
+            positions = np.arange(block, min(block + block_size, n))
+            draws = np.array([rng.sample(range(ws - ss), ss) for _ in positions]).reshape(len(positions), ss)
+
+            window_start = positions - ws + 1
+            rnd_window = x[window_start[:, None] + draws]
+            most_recent = x[positions[:, None] - ss + 1 + np.arange(ss)[None, :]]
+
+            pooled = np.concatenate([rnd_window, most_recent], axis=1)
+            cdf_a = (rnd_window[:, None, :] <= pooled[:, :, None]).sum(axis=2)
+            cdf_b = (most_recent[:, None, :] <= pooled[:, :, None]).sum(axis=2)
+            d = np.abs(cdf_a - cdf_b).max(axis=1)
+
+            hits = np.flatnonzero((pvalues[d] <= a) & (d / ss > 0.1))
+            if hits.size > 0:
+                detected = positions[hits[0]]
+                break
+
+        if detected is None:
+            break
+        drift_points.append(int(detected))
+        # o detector é reiniciado na atualização seguinte ao drift
+        start = detected + 1
+
+    return drift_points
+
+
+DETECTORS = {
+    'kswin': detect_kswin_drift,
+    'kswin_numpy': detect_kswin_drift_numpy,
+    'adwin': detect_adwin_drift,
+}
+
+
+def _detect_series(args):
+    detector, series, params = args
+    detection_function = DETECTORS[detector] if isinstance(detector, str) else detector
+    return detection_function(series, **params)
+
+
+def detect_drift_batch(series, detector='kswin_numpy', by=None, value=None, num_workers=None, **params):
+    """
+    Detecta pontos de mudança em várias séries de uma vez, em paralelo entre processos.
+
+    :param series: Matriz 2-D (uma série por linha), lista de séries ou DataFrame.
+    :param detector: 'kswin', 'kswin_numpy', 'adwin' ou uma função (série, **params) -> pontos.
+                     Funções próprias precisam ser definidas no nível do módulo.
+    :param by: Colunas de agrupamento quando `series` é um DataFrame (ex.: ['match_id', 'team_id']).
+    :param value: Coluna com a métrica quando `series` é um DataFrame.
+    :param num_workers: Número de processos (padrão: cpu_count() - 1; 1 executa em série).
+    :param params: Parâmetros do detector (ex.: a, ws, ss, seed).
+    :return: Lista de pontos de drift por série ou, para DataFrame, dicionário {grupo: pontos}.
+    """
+    if isinstance(series, pd.DataFrame):
+        groups = series.groupby(by, sort=True)[value]
+        keys = list(groups.groups.keys())
+        data = [group.to_numpy() for _, group in groups]
+    else:
+        keys = None
+        data = [np.asarray(s, dtype=float) for s in series]
+
+    tasks = [(detector, s, params) for s in data]
+    num_workers = max(1, cpu_count() - 1) if num_workers is None else num_workers
+
+    if num_workers == 1 or len(tasks) <= 1:
+        results = [_detect_series(task) for task in tasks]
+    else:
+        with Pool(processes=num_workers) as pool:
+            results = pool.map(_detect_series, tasks, chunksize=max(1, len(tasks) // (4 * num_workers)))
+
+    if keys is not None:
+        return dict(zip(keys, results))
+    return results
@@ -3,70 +3,83 @@ from river import drift
 import numpy as np
 from sklearn.metrics import precision_score, recall_score, f1_score
 import pandas as pd
+from multiprocessing import Pool, cpu_count
+from contextlib import nullcontext
+import warnings
 from .syntethic_graphs import generate_synthetic_data
 
 
-def evaluate_drift_performance(expected_drifts, detected_drifts, tolerance_interval):
+def evaluate_drift_performance_batch(expected_drifts, detected_drifts_list, tolerance_interval, max_delay=10000):
     """
-    Evaluate the performance of a drift detection model.
+    Evaluate many lists of detected drifts against the same expected drifts in one vectorized call.
+
+    Detected drifts are matched greedily in sorted order to the first unmatched expected drift within
+    the tolerance interval. Matched expected drifts are always increasing, so the matching advances
+    one pointer per list and is carried out for all lists at once, one detection position at a time.
 
     Parameters:
-    - data_stream: List or array of data points.
     - expected_drifts: List of indices where drifts are expected.
-    - detected_drifts: List of indices where drifts were detected by the model.
-    - tolerance_interval: Integer representing the acceptable range (in indices) before an expected drift for a detection to be considered true positive.
+    - detected_drifts_list: List of lists of indices where drifts were detected.
+    - tolerance_interval: Integer representing the acceptable range (in indices) around an expected drift for a detection to be considered true positive.
+    - max_delay: Delay assigned to a detection when there is no expected drift closer than it.
 
     Returns:
-    - A dictionary containing the calculated metrics.
+    - A DataFrame with one row per detection list and the metrics of evaluate_drift_performance as columns.
     """
-    true_positives = 0
-    false_positives = 0
-    false_negatives = 0
-    detection_delays = []
-
-    # Sort the lists to ensure proper comparison
-    expected_drifts = sorted(expected_drifts)
-    detected_drifts = sorted(detected_drifts)
-
-    # Track which expected drifts have been detected
-    detected_flags = [False] * len(expected_drifts)
-
-    for detected in detected_drifts:
-        # Check if the detected drift is within the tolerance interval of any expected drift
-        match_found = False
-
-        diff = 10000
-
-        for i, expected in enumerate(expected_drifts):
-            if(abs(expected - detected) < diff):
-                diff = abs(expected - detected)
-            if not detected_flags[i] and expected - tolerance_interval <= detected <= expected + tolerance_interval:
-                true_positives += 1
-                detected_flags[i] = True
-                match_found = True
-                break
-            
-        if not match_found:
-            false_positives += 1
-
-        detection_delays.append(diff)
-
-    # Any expected drifts not detected within the tolerance interval are false negatives
-    false_negatives = detected_flags.count(False)
-
-    # Calculate metrics
-    num_expected_drifts = len(expected_drifts)
-    num_detected_drifts = len(detected_drifts)
-
-    true_detection_rate = true_positives / num_expected_drifts if num_expected_drifts > 0 else 0
-    false_negative_rate = false_negatives / num_expected_drifts if num_expected_drifts > 0 else 0
-    false_positive_rate = false_positives / num_detected_drifts if num_detected_drifts > 0 else 0
-    average_detection_delay = sum(detection_delays) / len(detected_drifts) if len(detected_drifts) > 0 else float('inf')
-    recall = true_detection_rate
-    precision = true_positives / num_detected_drifts if num_detected_drifts > 0 else 0
-    f1_score = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
-
-    return {
+    expected = np.sort(np.asarray(expected_drifts, dtype=float))
+    n_lists = len(detected_drifts_list)
+    lengths = np.array([len(d) for d in detected_drifts_list], dtype=int)
+    max_len = lengths.max() if n_lists > 0 else 0
+
+    detected = np.full((n_lists, max_len), np.nan)
+    for i, d in enumerate(detected_drifts_list):
+        detected[i, :len(d)] = np.sort(np.asarray(d, dtype=float))
+    valid = np.arange(max_len)[None, :] < lengths[:, None]
+
+    n_expected = len(expected)
+    true_positives = np.zeros(n_lists, dtype=int)
+    delays = np.zeros((n_lists, max_len))
+
+    if n_expected == 0:
+        delays[:] = max_delay
+    else:
+        pointer = np.zeros(n_lists, dtype=int)  # first expected drift not yet matched
+        safe = np.where(valid, detected, 0)
+        first_in_window = np.searchsorted(expected, safe - tolerance_interval, side='left')
+        first_above = np.searchsorted(expected, safe, side='left')
+
+        for k in range(max_len):
+            d = safe[:, k]
+            j = np.maximum(pointer, first_in_window[:, k])
+            j_clip = np.minimum(j, n_expected - 1)
+            match = valid[:, k] & (j < n_expected) & (expected[j_clip] <= d + tolerance_interval)
+
+            # delay: closest expected drift among those scanned before the match (all if no match)
+            last = np.where(match, j_clip, n_expected - 1)
+            s = first_above[:, k]
+            below = np.where(s > 0, d - expected[np.maximum(s - 1, 0)], np.inf)
+            above = np.where(s <= last, expected[np.minimum(s, n_expected - 1)] - d, np.inf)
+            prefix_delay = np.where(s <= last, np.minimum(below, above), d - expected[last])
+            delays[:, k] = np.minimum(prefix_delay, max_delay)
+
+            true_positives += match
+            pointer = np.where(match, j + 1, pointer)
+
+    delays = np.where(valid, delays, 0)
+
+    false_positives = lengths - true_positives
+    false_negatives = n_expected - true_positives
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        true_detection_rate = true_positives / n_expected if n_expected > 0 else np.zeros(n_lists)
+        false_negative_rate = false_negatives / n_expected if n_expected > 0 else np.zeros(n_lists)
+        false_positive_rate = np.where(lengths > 0, false_positives / lengths, 0)
+        average_detection_delay = np.where(lengths > 0, delays.sum(axis=1) / lengths, float('inf'))
+        precision = np.where(lengths > 0, true_positives / lengths, 0)
+        recall = true_detection_rate
+        f1_score = np.where(precision + recall > 0, 2 * (precision * recall) / (precision + recall), 0)
+
+    return pd.DataFrame({
         'true_detection_rate': true_detection_rate,
         'false_negative_rate': false_negative_rate,
         'false_positive_rate': false_positive_rate,
@@ -74,55 +87,165 @@ def evaluate_drift_performance(expected_drifts, detected_drifts, tolerance_inter
         'recall': recall,
         'precision': precision,
         'f1_score': f1_score
-    }
+    })
 
 
+def evaluate_drift_performance(expected_drifts, detected_drifts, tolerance_interval):
+    """
+    Evaluate the performance of a drift detection model.
 
-def optimize_drift_parameters(detection_function, param_grid, repetitions=3):
+    Parameters:
+    - expected_drifts: List of indices where drifts are expected.
+    - detected_drifts: List of indices where drifts were detected by the model.
+    - tolerance_interval: Integer representing the acceptable range (in indices) before an expected drift for a detection to be considered true positive.
+
+    Returns:
+    - A dictionary containing the calculated metrics.
+    """
+    metrics = evaluate_drift_performance_batch(expected_drifts, [detected_drifts], tolerance_interval)
+    return {name: float(value) for name, value in metrics.iloc[0].items()}
+
+
+# séries sintéticas compartilhadas com os processos do pool (ver _init_worker)
+_series = []
+
+
+def _init_worker(series):
+    global _series
+    _series = series
+
+
+def _evaluate_params(args):
+    """Avalia uma combinação de parâmetros nas repetições indicadas das séries compartilhadas."""
+    detection_function, id_params, params, repetitions, tolerance_interval = args
+    rows = []
+    for rep in repetitions:
+        metric_series, expected_drift_points = _series[rep]
+        try:
+            drift_points = detection_function(metric_series, **params)
+        except Exception as e:
+            rows.append({'id_params': id_params, 'params': params, 'repetition': rep, 'error': repr(e)})
+            continue
+
+        metrics = evaluate_drift_performance(expected_drift_points, drift_points, tolerance_interval=tolerance_interval)
+        rows.append({
+            'id_params': id_params,
+            'params': params,
+            'repetition': rep,
+            'detected_drifts': drift_points,
+            'expected_drifts': expected_drift_points,
+            'true_detection_rate': metrics['true_detection_rate'],
+            'false_negative_rate': metrics['false_negative_rate'],
+            'false_positive_rate': metrics['false_positive_rate'],
+            'delay': metrics['delay'],
+            'precision': metrics['precision'],
+            'recall': metrics['recall'],
+            'f1_score': metrics['f1_score']
+        })
+    return rows
+
+
+def _valid_params(params):
+    # stat_size precisa ser menor que window_size no KSWIN
+    return not ('ws' in params and 'ss' in params and params['ss'] >= params['ws'])
+
+
+def _save_rows(rows, results_path, header):
+    """Escreve as linhas no CSV (com cabeçalho, sobrescrevendo, se header) e retorna se escreveu."""
+    if results_path and rows:
+        pd.DataFrame(rows).to_csv(results_path, mode='w' if header else 'a', header=header, index=False)
+        return True
+    return False
+
+
+def optimize_drift_parameters(detection_function, param_grid, repetitions=3, search='grid', n_iter=50,
+                              eta=3, min_repetitions=1, num_workers=None, results_path=None,
+                              n_samples=50, max_drifts=3, tolerance_interval=2, seed=None):
     """
     Optimizes parameters for a drift detection function using a grid search with robust evaluation.
 
+    The synthetic series are generated once (one per repetition, repetition i with i % max_drifts + 1
+    drifts) and
+    shared by every parameter combination, which are evaluated in parallel across a process pool.
+
     Parameters:
-        detection_function (function): Drift detection function to optimize.
-        metric_series (list): Series of metrics for drift detection.
+        detection_function (function): Drift detection function to optimize (a module-level function
+            when num_workers > 1, so it can be sent to the worker processes).
         param_grid (dict): Dictionary with parameters to optimize.
-        expected_drifts (list): List of known drift points for evaluation.
+        repetitions (int): Number of synthetic series each combination is evaluated on.
+        search (str): 'grid' evaluates every combination, 'random' a sample of n_iter combinations,
+            'halving' runs successive halving: all combinations start on min_repetitions series and
+            only the best 1/eta (by mean f1_score, then recall) go on to eta times more series.
+        n_iter (int): Number of combinations sampled by the random search.
+        eta (int): Reduction factor of the successive halving.
+        min_repetitions (int): Series used in the first successive halving round.
+        num_workers (int, optional): Number of processes. Defaults to cpu_count() - 1, 1 runs serially.
+        results_path (str, optional): CSV file where results are appended after every round.
+        n_samples (int): Length of each synthetic series.
+        max_drifts (int): Maximum number of drifts in a synthetic series.
+        tolerance_interval (int): Tolerance used by evaluate_drift_performance.
+        seed (int, optional): Seed for the synthetic series and the random search.
 
     Returns:
-        dict: Best parameters and their corresponding evaluation metrics.
+        DataFrame: One row per (combination, repetition) with at least one detected drift. Combinations
+        that raised an error are reported with a warning instead of being silently skipped.
     """
+    if seed is not None:
+        np.random.seed(seed)
+    series = [generate_synthetic_data(n_samples=n_samples, n_drifts=rep % max_drifts + 1) for rep in range(repetitions)]
+
+    candidates = [(id, params) for id, params in enumerate(ParameterGrid(param_grid)) if _valid_params(params)]
+    if search == 'random' and n_iter < len(candidates):
+        rng = np.random.default_rng(seed)
+        candidates = [candidates[i] for i in sorted(rng.choice(len(candidates), n_iter, replace=False))]
+    elif search not in ('grid', 'random', 'halving'):
+        raise ValueError("Invalid search. Choose between 'grid', 'random' or 'halving'.")
+
+    if search == 'halving':
+        rounds = []
+        used = 0
+        budget = max(1, min_repetitions)
+        while used < repetitions:
+            budget = min(repetitions, budget)
+            rounds.append(list(range(used, budget)))
+            used = budget
+            budget *= eta
+    else:
+        rounds = [list(range(repetitions))]
+
+    num_workers = max(1, cpu_count() - 1) if num_workers is None else num_workers
+
+    if num_workers <= 1:
+        _init_worker(series)
+        pool = nullcontext()
+    else:
+        pool = Pool(processes=num_workers, initializer=_init_worker, initargs=(series,))
 
     results = []
-
-    for rep in range(repetitions):
-
-        metric_series, expected_drift_points = generate_synthetic_data(n_samples=50, n_drifts=rep+1)
-
-        for id, params in enumerate(ParameterGrid(param_grid)):
-            try:
-                # Modify this check to log rather than skip invalid combinations
-                if 'ws' in params and 'ss' in params and params['ss'] >= params['ws']:
-                    #print(f"Invalid params: {params}. Skipping as stat_size >= window_size.")
-                    continue
-
-                drift_points = detection_function(metric_series, **params)
-                metrics = evaluate_drift_performance(expected_drift_points, drift_points, tolerance_interval=2)
-                if len(drift_points) > 0:
-                    results.append({
-                        'id_params': id,
-                        'params': params,
-                        'detected_drifts': drift_points,
-                        'expected_drifts': expected_drift_points,
-                        'true_detection_rate': metrics['true_detection_rate'],
-                        'false_negative_rate': metrics['false_negative_rate'],
-                        'false_positive_rate': metrics['false_positive_rate'],
-                        'delay': metrics['delay'],
-                        'precision': metrics['precision'],
-                        'recall': metrics['recall'],
-                        'f1_score': metrics['f1_score']
-                    })
-
-            except Exception as e:
-                continue
-
-    return pd.DataFrame(results)
\ No newline at end of file
+    errors = []
+    written = False
+    with pool:
+        imap = map if num_workers <= 1 else pool.imap_unordered
+        for round_index, reps in enumerate(rounds):
+            tasks = [(detection_function, id, params, reps, tolerance_interval) for id, params in candidates]
+            round_rows = []
+            for rows in imap(_evaluate_params, tasks):
+                round_rows.extend(rows)
+
+            errors.extend(row for row in round_rows if 'error' in row)
+            round_rows = [row for row in round_rows if 'error' not in row]
+            written = _save_rows([row for row in round_rows if len(row['detected_drifts']) > 0], results_path,
+                                 header=not written) or written
+            results.extend(round_rows)
+
+            if search == 'halving' and round_index < len(rounds) - 1 and results:
+                scores = pd.DataFrame(results).groupby('id_params')[['f1_score', 'recall']].mean()
+                keep = max(1, len(candidates) // eta)
+                best = scores.sort_values(['f1_score', 'recall'], ascending=False).index[:keep]
+                candidates = [(id, params) for id, params in candidates if id in set(best)]
+
+    if errors:
+        warnings.warn(f"{len(errors)} evaluations failed, e.g. params={errors[0]['params']}: {errors[0]['error']}")
+
+    results = [row for row in results if len(row['detected_drifts']) > 0]
+    return pd.DataFrame(results)
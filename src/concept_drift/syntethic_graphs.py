@@ -3,6 +3,17 @@ import pandas as pd
 from sklearn.datasets import make_classification
 import matplotlib.pyplot as plt
 
+# Base (x, y) positions in meters of shirts 1..11 for a team attacking towards +x
+# (105 x 68 pitch centered at the origin, as in the tracking data).
+FORMATIONS = {
+    '4-4-2': [(-48, 0), (-30, -24), (-32, -8), (-32, 8), (-30, 24), (-8, -24), (-10, -8), (-10, 8), (-8, 24), (12, -8), (12, 8)],
+    '4-3-3': [(-48, 0), (-30, -24), (-32, -8), (-32, 8), (-30, 24), (-12, -14), (-14, 0), (-12, 14), (14, -22), (16, 0), (14, 22)],
+    '3-5-2': [(-48, 0), (-32, -14), (-34, 0), (-32, 14), (-10, -28), (-14, -10), (-16, 0), (-14, 10), (-10, 28), (12, -8), (12, 8)],
+    '5-3-2': [(-48, 0), (-28, -28), (-34, -14), (-36, 0), (-34, 14), (-28, 28), (-12, -14), (-14, 0), (-12, 14), (10, -8), (10, 8)],
+    '4-2-3-1': [(-48, 0), (-30, -24), (-32, -8), (-32, 8), (-30, 24), (-18, -8), (-18, 8), (0, -22), (2, 0), (0, 22), (18, 0)],
+}
+
+
 def generate_synthetic_data(n_samples=50, n_drifts=3, value_range=(0, 5)):
     """
     Generates a synthetic dataset with concept drifts.
@@ -55,4 +66,204 @@ def draw_synthetic_data(synthetic_data, drift_points, detected_drifts=None):
     plt.ylabel('Feature Value')
     plt.title('Synthetic Data with Concept Drift')
     plt.legend()
-    plt.show()
\ No newline at end of file
+    plt.show()
+
+
+def _drift_points(n, n_drifts, rng, min_gap=1):
+    """Draws n_drifts distinct sorted change points in [min_gap, n - min_gap)."""
+    candidates = np.arange(min_gap, max(min_gap + 1, n - min_gap))
+    n_drifts = min(n_drifts, len(candidates))
+    return np.sort(rng.choice(candidates, n_drifts, replace=False))
+
+
+def _segment_formations(n_segments, rng):
+    """Picks one formation per segment, always different from the previous segment."""
+    names = list(FORMATIONS)
+    chosen = [rng.integers(len(names))]
+    for _ in range(n_segments - 1):
+        chosen.append((chosen[-1] + rng.integers(1, len(names))) % len(names))
+    return np.array([FORMATIONS[names[i]] for i in chosen], dtype=float), [names[i] for i in chosen]
+
+
+def generate_synthetic_tracking(match_id=1, duration=5400, fps=5, original_fps=30, n_drifts=2, seed=None):
+    """
+    Generates synthetic tracking data for one match as metadata_df / players_df.
+
+    Each team switches formation at n_drifts points (planted tactical drifts). Player positions are
+    the formation of the current segment, shifted by ball possession, plus smooth oscillations;
+    velocities are the time derivative of the positions.
+
+    Parameters:
+        match_id (int): Match identifier.
+        duration (int): Duration in seconds, split into two equal periods.
+        fps (int): Generated frames per second.
+        original_fps (int): Frame rate used to number frame_id.
+        n_drifts (int): Number of formation changes per team.
+        seed (int, optional): Random seed.
+
+    Returns:
+        tuple: metadata_df, players_df and the drift points {'home': frame_ids, 'away': frame_ids}.
+    """
+    rng = np.random.default_rng(seed)
+    n_frames = int(duration * fps)
+    index = np.arange(n_frames)
+    frame_id = index * (original_fps // fps)
+    seconds = index / fps
+
+    half = n_frames // 2
+    period = np.where(index < half, 1, 2)
+    elapsed_seconds = np.where(period == 1, seconds, seconds - half / fps)
+
+    # possessions last ~10 s and events ~2 s
+    possession_id = np.cumsum(rng.random(n_frames) < 1 / (10 * fps)) + 1
+    home_has_possession = rng.random(possession_id.max() + 1) < 0.5
+    home_has_possession = home_has_possession[possession_id]
+    event_id = np.cumsum(rng.random(n_frames) < 1 / (2 * fps)) + 1
+    event_types = np.array(['PASS', 'BALL_CARRY', 'CHALLENGE', 'CLEARANCE', 'SHOT'])
+    event_type = event_types[rng.choice(len(event_types), event_id.max() + 1, p=[0.6, 0.25, 0.08, 0.05, 0.02])][event_id]
+
+    metadata_df = pd.DataFrame({
+        'match_id': match_id,
+        'frame_id': frame_id,
+        'period': period,
+        'elapsed_seconds': elapsed_seconds,
+        'home_has_possession': home_has_possession,
+        'possession_id': possession_id.astype(float),
+        'event_id': event_id.astype(float),
+        'event_type': event_type,
+        'event_setpiece_type': None,
+    })
+    for key, prefix in (('possession_id', 'possession'), ('event_id', 'event')):
+        groups = metadata_df.groupby(key)['frame_id']
+        metadata_df[f'{prefix}_start_frame'] = groups.transform('min').astype(float)
+        metadata_df[f'{prefix}_end_frame'] = groups.transform('max').astype(float)
+    kick_off = np.isin(index, [0, half])
+    metadata_df.loc[kick_off, 'event_setpiece_type'] = 'SetPieceType.KICK_OFF'
+
+    players = []
+    drift_points = {}
+    for team, side in (('home', 1), ('away', -1)):
+        drifts = _drift_points(n_frames, n_drifts, rng, min_gap=n_frames // (2 * (n_drifts + 1)) or 1)
+        drift_points[team] = frame_id[drifts].tolist()
+        formations, _ = _segment_formations(len(drifts) + 1, rng)
+        segment = np.searchsorted(drifts, index, side='right')
+
+        base = formations[segment]                                       # (n_frames, 11, 2)
+        in_possession = home_has_possession if team == 'home' else ~home_has_possession
+        base[:, :, 0] += np.where(in_possession, 6.0, -6.0)[:, None]
+
+        # smooth oscillations with random frequency and phase per player
+        freq = rng.uniform(1 / 60, 1 / 15, (1, 11, 2))
+        phase = rng.uniform(0, 2 * np.pi, (1, 11, 2))
+        amplitude = rng.uniform(2, 6, (1, 11, 2))
+        position = base + amplitude * np.sin(2 * np.pi * freq * seconds[:, None, None] + phase)
+        position += rng.normal(0, 0.3, position.shape)
+
+        # teams switch sides at half time
+        direction = np.where(period == 1, side, -side)[:, None, None]
+        position = position * direction
+        velocity = np.gradient(position, axis=0) * fps
+
+        players.append(pd.DataFrame({
+            'match_id': match_id,
+            'frame_id': np.repeat(frame_id, 11),
+            'period': np.repeat(period, 11),
+            'team': team,
+            'shirt': np.tile(np.arange(1, 12), n_frames),
+            'x': position[:, :, 0].ravel(),
+            'y': position[:, :, 1].ravel(),
+            'vx': velocity[:, :, 0].ravel(),
+            'vy': velocity[:, :, 1].ravel(),
+        }))
+
+    players_df = pd.concat(players, ignore_index=True).sort_values(['frame_id', 'team', 'shirt'], kind='stable')
+    return metadata_df, players_df.reset_index(drop=True), drift_points
+
+
+def generate_synthetic_pass_networks(match_id=1, n_intervals=45, n_drifts=2, passes_per_interval=40,
+                                     home_team_id=1, away_team_id=2, seed=None):
+    """
+    Generates pass counts and average positions per interval in the format get_interval_graphs expects.
+
+    For each team and segment between drifts, the pass rate between two players decays with their
+    distance in the segment formation, scaled by random pair weights; the counts of each interval
+    are drawn from a Poisson distribution with these rates.
+
+    Parameters:
+        match_id (int): Match identifier.
+        n_intervals (int): Number of intervals.
+        n_drifts (int): Number of drifts per team.
+        passes_per_interval (float): Expected number of passes per team and interval.
+        home_team_id, away_team_id (int): Team identifiers.
+        seed (int, optional): Random seed.
+
+    Returns:
+        tuple: passes_df, positions_df and the drift points {team_id: interval_ids}.
+    """
+    rng = np.random.default_rng(seed)
+    interval_id = np.arange(1, n_intervals + 1)
+    shirts = np.arange(1, 12)
+
+    passes, positions = [], []
+    drift_points = {}
+    for team_id in (home_team_id, away_team_id):
+        drifts = _drift_points(n_intervals, n_drifts, rng, min_gap=max(1, n_intervals // (2 * (n_drifts + 1))))
+        drift_points[team_id] = interval_id[drifts].tolist()
+        formations, _ = _segment_formations(len(drifts) + 1, rng)
+        segment = np.searchsorted(drifts, np.arange(n_intervals), side='right')
+
+        distance = np.linalg.norm(formations[:, :, None, :] - formations[:, None, :, :], axis=-1)
+        weights = np.exp(-distance / 20) * rng.gamma(2.0, 1.0, distance.shape)
+        weights[:, np.arange(11), np.arange(11)] = 0
+        weights[:, 0, 10] = weights[:, 10, 0] = 0  # no passes between goalkeeper and striker
+        rates = passes_per_interval * weights / weights.sum(axis=(1, 2), keepdims=True)
+
+        counts = rng.poisson(rates[segment])                           # (n_intervals, 11, 11)
+        i, p, r = np.nonzero(counts)
+        passes.append(pd.DataFrame({
+            'match_id': match_id,
+            'interval_id': interval_id[i],
+            'team_id': team_id,
+            'player_shirt': shirts[p],
+            'receiver_shirt': shirts[r],
+            'count': counts[i, p, r],
+        }))
+
+        position = formations[segment] + rng.normal(0, 2, (n_intervals, 11, 2))
+        positions.append(pd.DataFrame({
+            'match_id': match_id,
+            'interval_id': np.repeat(interval_id, 11),
+            'team_id': team_id,
+            'player_id': team_id * 100 + np.tile(shirts, n_intervals),
+            'shirt': np.tile(shirts, n_intervals),
+            'x': position[:, :, 0].ravel(),
+            'y': position[:, :, 1].ravel(),
+        }))
+
+    passes_df = pd.concat(passes, ignore_index=True)
+    positions_df = pd.concat(positions, ignore_index=True).sort_values(['interval_id', 'team_id'], kind='stable')
+    return passes_df, positions_df.reset_index(drop=True), drift_points
+
+
+def generate_synthetic_graph_stream(n_matches=1, n_intervals=45, n_drifts=2, passes_per_interval=40, seed=None):
+    """
+    Generates the interval graph list (as written by save_graphs) for n_matches synthetic matches,
+    e.g. a full season with n_matches=380.
+
+    Returns:
+        tuple: The graph list and the drift points {(match_id, team_id): interval_ids}.
+    """
+    from src.pass_networks.process_intervals import get_interval_graphs
+
+    rng = np.random.default_rng(seed)
+    graph_list = []
+    drift_points = {}
+    for match_id in range(1, n_matches + 1):
+        home_team_id, away_team_id = rng.choice(np.arange(1, 21), 2, replace=False)
+        passes_df, positions_df, drifts = generate_synthetic_pass_networks(
+            match_id, n_intervals, n_drifts, passes_per_interval,
+            int(home_team_id), int(away_team_id), seed=rng.integers(2**32)
+        )
+        graph_list += get_interval_graphs(passes_df, positions_df)
+        drift_points.update({(match_id, team_id): points for team_id, points in drifts.items()})
+    return graph_list, drift_points
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.concept_drift.drift_points import detect_drift_batch, detect_kswin_drift, detect_kswin_drift_numpy
+
+
+def _series(seed, size=600):
+    rng = np.random.default_rng(seed)
+    levels = rng.choice([0.0, 1.0, 3.0], size=6)
+    return np.concatenate([rng.normal(level, 0.5, size // 6) for level in levels])
+
+
+@pytest.mark.parametrize('params', [
+    dict(a=0.05, ws=20, ss=6, seed=42),
+    dict(a=0.05, ws=30, ss=10, seed=7),
+    dict(a=0.005, ws=100, ss=30, seed=1),
+])
+def test_numpy_kswin_matches_river(params):
+    for seed in range(5):
+        x = _series(seed)
+        assert detect_kswin_drift_numpy(x, **params) == detect_kswin_drift(x, **params)
+
+
+def test_numpy_kswin_across_blocks():
+    x = _series(0, size=3000)
+    params = dict(a=0.01, ws=50, ss=15, seed=3)
+    assert detect_kswin_drift_numpy(x, block_size=16, **params) == detect_kswin_drift(x, **params)
+
+
+def test_batch_matches_one_series_at_a_time():
+    frames = []
+    for match_id in range(2):
+        for team_id in range(2):
+            x = _series(10 * match_id + team_id, size=300)
+            frames.append(pd.DataFrame({'match_id': match_id, 'team_id': team_id, 'density': x}))
+    df = pd.concat(frames, ignore_index=True)
+
+    result = detect_drift_batch(df, by=['match_id', 'team_id'], value='density', num_workers=2, ws=30, ss=10)
+    for (match_id, team_id), points in result.items():
+        x = df[(df['match_id'] == match_id) & (df['team_id'] == team_id)]['density'].to_numpy()
+        assert points == detect_kswin_drift(x, ws=30, ss=10)
+    assert len(result) == 4
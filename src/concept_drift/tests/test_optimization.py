@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from src.concept_drift.optimization import evaluate_drift_performance, evaluate_drift_performance_batch
+
+
+def _reference(expected_drifts, detected_drifts, tolerance_interval):
+    """Laço original de evaluate_drift_performance, antes da versão vetorizada."""
+    expected_drifts = sorted(expected_drifts)
+    detected_drifts = sorted(detected_drifts)
+    detected_flags = [False] * len(expected_drifts)
+    true_positives = 0
+    detection_delays = []
+
+    for detected in detected_drifts:
+        diff = 10000
+        for i, expected in enumerate(expected_drifts):
+            if abs(expected - detected) < diff:
+                diff = abs(expected - detected)
+            if not detected_flags[i] and expected - tolerance_interval <= detected <= expected + tolerance_interval:
+                true_positives += 1
+                detected_flags[i] = True
+                break
+        detection_delays.append(diff)
+
+    n_expected, n_detected = len(expected_drifts), len(detected_drifts)
+    recall = true_positives / n_expected if n_expected > 0 else 0
+    precision = true_positives / n_detected if n_detected > 0 else 0
+    return {
+        'true_detection_rate': recall,
+        'false_negative_rate': detected_flags.count(False) / n_expected if n_expected > 0 else 0,
+        'false_positive_rate': (n_detected - true_positives) / n_detected if n_detected > 0 else 0,
+        'delay': sum(detection_delays) / n_detected if n_detected > 0 else float('inf'),
+        'recall': recall,
+        'precision': precision,
+        'f1_score': 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0,
+    }
+
+
+def _cases(seed, n_lists=200):
+    rng = np.random.default_rng(seed)
+    expected = sorted(rng.choice(500, size=rng.integers(0, 6), replace=False).tolist())
+    detected_list = [rng.integers(0, 500, size=rng.integers(0, 12)).tolist() for _ in range(n_lists)]
+    # detecções próximas (e repetidas) dos drifts esperados
+    for detected in detected_list[::3]:
+        detected += [e + int(rng.integers(-4, 5)) for e in expected for _ in range(rng.integers(0, 3))]
+    return expected, detected_list
+
+
+@pytest.mark.parametrize('seed', range(6))
+@pytest.mark.parametrize('tolerance_interval', [0, 2, 10])
+def test_batch_matches_the_loop(seed, tolerance_interval):
+    expected, detected_list = _cases(seed)
+    batch = evaluate_drift_performance_batch(expected, detected_list, tolerance_interval)
+    assert len(batch) == len(detected_list)
+    for row, detected in zip(batch.to_dict('records'), detected_list):
+        reference = _reference(expected, detected, tolerance_interval)
+        assert row.keys() == reference.keys()
+        for name, value in reference.items():
+            assert np.isclose(row[name], value), (name, expected, detected)
+
+
+def test_single_list_matches_the_loop():
+    expected, detected = [100, 200, 300], [98, 99, 205, 250, 301, 302]
+    assert evaluate_drift_performance(expected, detected, 2) == pytest.approx(_reference(expected, detected, 2))
+    assert evaluate_drift_performance(expected, [], 2) == _reference(expected, [], 2)
+    assert evaluate_drift_performance([], [5, 7], 2) == _reference([], [5, 7], 2)
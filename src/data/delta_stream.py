@@ -0,0 +1,206 @@
+import pickle
+from bisect import bisect_right
+from numbers import Number
+
+import numpy as np
+
+
+class _Block:
+    """
+    Frames sharing one topology: the keyframe keeps the graph type, nodes, edges and the
+    non-numeric attributes, every frame adds one row to the numeric attribute arrays.
+    """
+
+    def __init__(self, G, node_names, edge_names):
+        self.graph_type = type(G)
+        self.graph_attrs = {k: v for k, v in G.graph.items() if k != 'interval_id'}
+        self.nodes = list(G.nodes)
+        self.edges = list(G.edges)
+        self.node_names = node_names
+        self.edge_names = edge_names
+        # non-numeric node attributes (e.g. team), fixed within the block
+        self.static = [
+            {k: v for k, v in data.items() if k not in node_names} for _, data in G.nodes(data=True)
+        ]
+        self.node_rows = {name: [] for name in node_names}
+        self.edge_rows = {name: [] for name in edge_names}
+        self.node_values = {}
+        self.edge_values = {}
+        self.length = 0
+
+    def matches(self, G, node_names, edge_names):
+        """Whether G has the topology and static attributes of the block."""
+        return (
+            type(G) is self.graph_type
+            and node_names == self.node_names
+            and edge_names == self.edge_names
+            and {k: v for k, v in G.graph.items() if k != 'interval_id'} == self.graph_attrs
+            and list(G.nodes) == self.nodes
+            and list(G.edges) == self.edges
+            and all(
+                {k: v for k, v in data.items() if k not in node_names} == static
+                for (_, data), static in zip(G.nodes(data=True), self.static)
+            )
+        )
+
+    def append(self, G):
+        for name, rows in self.node_rows.items():
+            rows.append([data[name] for _, data in G.nodes(data=True)])
+        for name, rows in self.edge_rows.items():
+            rows.append([data[name] for *_, data in G.edges(data=True)])
+        self.length += 1
+
+    def freeze(self, dtype=None):
+        """Stacks the per-frame rows into (frames, nodes) and (frames, edges) arrays."""
+        self.node_values = {name: _stack(rows, dtype) for name, rows in self.node_rows.items()}
+        self.edge_values = {name: _stack(rows, dtype) for name, rows in self.edge_rows.items()}
+        if all(isinstance(node, (int, np.integer)) for node in self.nodes):
+            # integer node ids: edges as one (edges, 2) array
+            self.edges = _stack(self.edges, None).reshape(-1, 2)
+        del self.node_rows, self.edge_rows
+
+    def graph(self, offset, interval_id):
+        G = self.graph_type()
+        G.graph.update(self.graph_attrs)
+        G.graph['interval_id'] = interval_id
+
+        node_values = {name: values[offset].tolist() for name, values in self.node_values.items()}
+        G.add_nodes_from(
+            (node, {**{name: node_values[name][i] for name in self.node_names}, **self.static[i]})
+            for i, node in enumerate(self.nodes)
+        )
+        edge_values = {name: values[offset].tolist() for name, values in self.edge_values.items()}
+        edges = self.edges.tolist() if isinstance(self.edges, np.ndarray) else self.edges
+        G.add_edges_from(
+            (u, v, {name: edge_values[name][i] for name in self.edge_names})
+            for i, (u, v) in enumerate(edges)
+        )
+        return G
+
+    @property
+    def nbytes(self):
+        arrays = list(self.node_values.values()) + list(self.edge_values.values())
+        if isinstance(self.edges, np.ndarray):
+            arrays.append(self.edges)
+        return sum(array.nbytes for array in arrays)
+
+
+def _stack(rows, dtype):
+    values = np.asarray(rows)
+    if dtype is not None and np.issubdtype(values.dtype, np.floating):
+        values = values.astype(dtype)
+    elif np.issubdtype(values.dtype, np.integer) and values.size:
+        # smallest integer type holding the values (e.g. int8 for ball_team)
+        values = values.astype(np.result_type(
+            np.min_scalar_type(values.min()), np.min_scalar_type(values.max())
+        ))
+    return values
+
+
+def _numeric_names(items):
+    """Attribute names numeric in every node (or edge), in the order of the first one."""
+    items = list(items)
+    if not items:
+        return ()
+    names = [
+        k for k, v in items[0].items() if isinstance(v, Number) and not isinstance(v, bool)
+    ]
+    return tuple(
+        k for k in names
+        if all(k in data and isinstance(data[k], Number) and not isinstance(data[k], bool) for data in items)
+    )
+
+
+class DeltaGraphStream:
+    """
+    Graph stream stored as keyframes plus per-frame attribute arrays.
+
+    Consecutive frame graphs usually share their nodes and edges and only the positions,
+    velocities and distances change. Frames are grouped in blocks of at most keyframe_interval
+    frames with the same topology: the block keeps the topology once and the numeric node and
+    edge attributes of its frames as 2-D arrays. A new block starts every keyframe_interval
+    frames or whenever the topology (nodes, edges or non-numeric attributes) changes.
+
+    Items are (G, interval_id) tuples as in GraphStream, rebuilt on access, so the stream can
+    replace GraphStream.graphs.
+    """
+
+    def __init__(self, graphs, keyframe_interval: int = 100, dtype=None):
+        """
+        Args:
+            graphs: Iterable of (G, interval_id) tuples, in stream order.
+            keyframe_interval (int): Maximum number of frames per keyframe.
+            dtype (optional): Float dtype of the stored attributes (e.g. 'float32'), keeps the
+                original precision if None.
+        """
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be positive.")
+        self.keyframe_interval = keyframe_interval
+        self.interval_ids = []
+        self.blocks = []
+        self.starts = []
+
+        block = None
+        for G, interval_id in graphs:
+            node_names = _numeric_names(data for _, data in G.nodes(data=True))
+            edge_names = _numeric_names(data for *_, data in G.edges(data=True))
+            if (
+                block is None
+                or block.length >= keyframe_interval
+                or not block.matches(G, node_names, edge_names)
+            ):
+                if block is not None:
+                    block.freeze(dtype)
+                block = _Block(G, node_names, edge_names)
+                self.blocks.append(block)
+                self.starts.append(len(self.interval_ids))
+            block.append(G)
+            self.interval_ids.append(interval_id)
+        if block is not None:
+            block.freeze(dtype)
+
+        self._positions = {interval_id: i for i, interval_id in enumerate(self.interval_ids)}
+
+    def __len__(self):
+        return len(self.interval_ids)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("DeltaGraphStream index out of range")
+        b = bisect_right(self.starts, idx) - 1
+        interval_id = self.interval_ids[idx]
+        return self.blocks[b].graph(idx - self.starts[b], interval_id), interval_id
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def get(self, interval_id):
+        """Graph of the given interval_id."""
+        return self[self._positions[interval_id]][0]
+
+    @property
+    def n_keyframes(self):
+        return len(self.blocks)
+
+    @property
+    def nbytes(self):
+        """Bytes of the attribute and edge arrays."""
+        return sum(block.nbytes for block in self.blocks)
+
+    def to_list(self):
+        """Decodes the whole stream to a list of (G, interval_id) tuples."""
+        return list(self)
+
+    def get_graph_stream(self):
+        """Return the graph stream."""
+        yield from self
+
+    def save(self, path: str, file_name: str):
+        """Save the stream to a given path as pickle (loadable with GraphStream(path=...))."""
+        with open(f"{path}/{file_name}.pkl", 'wb') as f:
+            pickle.dump(self, f)
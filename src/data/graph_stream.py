@@ -4,17 +4,26 @@ from tqdm.auto import tqdm
 from multiprocessing import Pool, cpu_count
 import pickle
 
+from src.data.delta_stream import DeltaGraphStream
 from src.data.process_graphs import interval_to_graph
+from src.instrumentation import stage
+from src.data.schema import apply_schema, METADATA_SCHEMA, PLAYERS_SCHEMA
+from src.pass_networks.event_networks import match_seconds
 from src.viz.graph import plot_graph
 
 class GraphStream:
-    def __init__(self, df_tuple: tuple | None = None, fully_connected: bool = False, path: str | None = None):
+    def __init__(self, df_tuple: tuple | None = None, fully_connected: bool = False, path: str | None = None,
+                 interval: str = 'frame', edges: str = 'complete', edge_param: float | None = None,
+                 keyframe_interval: int | None = None):
         if path:
             self.graphs = self._load_graphs(path)
         else:
             self.metadata_df = df_tuple[0]
             self.players_df = df_tuple[1]
-            self.graphs = self._create_graphs(fully_connected=fully_connected)
+            self.graphs = self._create_graphs(interval=interval, fully_connected=fully_connected,
+                                              edges=edges, edge_param=edge_param)
+            if keyframe_interval:
+                self.compress(keyframe_interval)
 
     def __len__(self):
         return len(self.graphs)
@@ -22,60 +31,103 @@ class GraphStream:
     def __getitem__(self, idx):
         return self.graphs[idx]
 
-    def _get_args(self, merged_df, interval, fully_connected):
-        """Prepare arguments for multiprocessing based on the interval type."""
+    def compress(self, keyframe_interval: int = 100, dtype=None):
+        """
+        Stores the graphs as a DeltaGraphStream (keyframes plus per-frame attribute arrays),
+        sorted by interval_id so consecutive frames share their topology.
+        Indexing, iteration, view and save keep working on the compressed stream.
+        """
+        if not isinstance(self.graphs, DeltaGraphStream):
+            graphs = sorted(self.graphs, key=lambda graph: graph[1])
+            self.graphs = DeltaGraphStream(graphs, keyframe_interval=keyframe_interval, dtype=dtype)
+        return self.graphs
+
+    def _aggregate_interval(self, merged_df, key):
+        """
+        Reduces every interval to one row per player: mean position and velocity over the
+        interval frames, and the team with the ball in most of them.
+        """
+        merged_df = merged_df.assign(home_has_possession=merged_df["home_has_possession"].astype(float))
+        return (
+            merged_df.groupby([key, "match_id", "team", "shirt"], observed=True, sort=False)
+            .agg(
+                x=("x", "mean"),
+                y=("y", "mean"),
+                vx=("vx", "mean"),
+                vy=("vy", "mean"),
+                home_has_possession=("home_has_possession", "mean"),
+            )
+            .assign(home_has_possession=lambda df: df["home_has_possession"] >= 0.5)
+            .reset_index()
+        )
+
+    def _get_args(self, merged_df, interval, fully_connected, edges='complete', edge_param=None):
+        """
+        Prepare arguments for multiprocessing based on the interval type.
+
+        'possession' and '<n>_n_seconds' intervals are first aggregated to one row per player,
+        so their graphs have one node per player whatever the interval length.
+        """
         if interval == 'frame':
-            frame_ids = merged_df["frame_id"].unique()
-            return [
-                (frame_id, merged_df[merged_df["frame_id"] == frame_id], fully_connected)
-                for frame_id in tqdm(frame_ids, desc="Preparing arguments", total=len(frame_ids))
-            ]
+            key = "frame_id"
 
         elif interval == 'possession':
-            possession_ids = merged_df["possession_id"].unique()
-            return [
-                (possession_id, merged_df[merged_df["possession_id"] == possession_id], fully_connected)
-                for possession_id in tqdm(possession_ids, desc="Preparing arguments", total=len(possession_ids))
-            ]
+            key = "possession_id"
+            merged_df = self._aggregate_interval(merged_df, key)
 
         elif 'n_seconds' in interval:
             n = int(interval.split('_')[0])
-            merged_df['interval_id'] = (merged_df['elapsed_seconds'] // n).astype(int)
-            interval_ids = merged_df["interval_id"].unique()
-            return [
-                (interval_id, merged_df[merged_df["interval_id"] == interval_id], fully_connected)
-                for interval_id in tqdm(interval_ids, desc="Preparing arguments", total=len(interval_ids))
-            ]
+            key = "interval_id"
+            # game seconds, the second half continues after the first one
+            merged_df["interval_id"] = (merged_df["seconds"] // n).astype(int)
+            merged_df = self._aggregate_interval(merged_df, key)
 
         else:
             raise ValueError(f"Unknown interval type: {interval}")
 
-    def _create_graphs(self, interval='frame', fully_connected=False):
+        groups = merged_df.groupby(key, sort=False)
+        return [
+            (interval_id, interval_df, fully_connected, edges, edge_param)
+            for interval_id, interval_df in tqdm(groups, desc="Preparing arguments", total=groups.ngroups)
+        ]
+
+    def _create_graphs(self, interval='frame', fully_connected=False, edges='complete', edge_param=None):
         """
         Processes the raw data and returns a list of PyTorch Data objects.
 
         Args:
             interval (str): Interval type ('frame', 'possession', or 'n_seconds').
-            fully_connected (bool): Whether the graph is fully connected.
+            fully_connected (bool): Whether edges also connect players of different teams.
+            edges (str): Edge construction, 'complete', 'knn', 'radius' or 'delaunay'
+                (see process_graphs.EDGE_MODES).
+            edge_param (float, optional): Number of neighbours for 'knn', distance for 'radius'.
             num_workers (int, optional): Number of workers for multiprocessing. Defaults to cpu_count() - 1.
 
         Returns:
             list: A list of processed data objects.
         """
-        self.metadata_df["frame_id"] = self.metadata_df["frame_id"].astype(int)
-        self.players_df["frame_id"] = self.players_df["frame_id"].astype(int)
-        self.metadata_df["match_id"] = self.metadata_df["match_id"].astype(int)
-        self.players_df["match_id"] = self.players_df["match_id"].astype(int)
-
-        merged_df = pd.merge(
-            self.players_df,
-            self.metadata_df[["frame_id", "match_id", "possession_id", "home_has_possession"]],
-            on=["frame_id", "match_id"],
-            how="left",
-        )
+        with stage("graph_stream.merge", interval=interval) as s:
+            # no-op when the frames were loaded through the schema
+            self.metadata_df = apply_schema(self.metadata_df, METADATA_SCHEMA)
+            self.players_df = apply_schema(self.players_df, PLAYERS_SCHEMA)
+
+            metadata_df = self.metadata_df[["frame_id", "match_id", "possession_id", "home_has_possession"]]
+            if 'n_seconds' in interval:
+                # new column on the selected columns only, the caller's DataFrame is left untouched
+                metadata_df = metadata_df.assign(seconds=match_seconds(self.metadata_df))
+
+            merged_df = pd.merge(
+                self.players_df,
+                metadata_df,
+                on=["frame_id", "match_id"],
+                how="left",
+            )
+            s.count("rows", len(merged_df))
 
         # Prepare arguments for multiprocessing
-        args = self._get_args(merged_df, interval, fully_connected)
+        with stage("graph_stream.get_args", interval=interval) as s:
+            args = self._get_args(merged_df, interval, fully_connected, edges, edge_param)
+            s.count("intervals", len(args))
 
         # Default to cpu_count() - 1 if num_workers is not provided
         num_workers = max(1, cpu_count() - 2)
@@ -84,11 +136,14 @@ class GraphStream:
         data_list = []
 
         # Use multiprocessing to process data in parallel
-        with Pool(processes=num_workers) as pool:
-            with tqdm(total=len(args), desc="Processing data") as pbar:
-                for graph in pool.imap_unordered(interval_to_graph, args):
-                    data_list.append(graph)
-                    pbar.update()
+        with stage("graph_stream.create_graphs", interval=interval, edges=edges, num_workers=num_workers) as s:
+            with Pool(processes=num_workers) as pool:
+                with tqdm(total=len(args), desc="Processing data") as pbar:
+                    for graph in pool.imap_unordered(interval_to_graph, args):
+                        data_list.append(graph)
+                        s.count("graphs")
+                        s.count("edges", graph[0].number_of_edges())
+                        pbar.update()
 
         del merged_df
         return data_list
@@ -7,6 +7,7 @@ from multiprocessing import Pool
 import numpy as np
 import pyarrow.parquet as pq
 
+from src.instrumentation import stage
 from src.data.process_game import process_game, load_game, filter_invalid_frames, remove_set_pieces, reduce_frame_rate
 
 class FramesLoader:
@@ -34,12 +35,14 @@ class FramesLoader:
             tasks = [(game_id, path) for game_id in self.game_ids]
 
             num_workers = 2  # Leave one CPU free
-            with Pool(processes=num_workers) as pool:
-                # Use tqdm for progress bar
-                with tqdm(total=len(tasks), desc="Loading Games") as pbar:
-                    for match_id in pool.imap_unordered(load_game, tasks):
-                        frames.append(match_id)
-                        pbar.update()
+            with stage("frames_loader.load", source="parquet", num_workers=num_workers) as s:
+                with Pool(processes=num_workers) as pool:
+                    # Use tqdm for progress bar
+                    with tqdm(total=len(tasks), desc="Loading Games") as pbar:
+                        for match_id in pool.imap_unordered(load_game, tasks):
+                            frames.append(match_id)
+                            self._count_frames(s, match_id)
+                            pbar.update()
 
                 
         else:
@@ -47,15 +50,29 @@ class FramesLoader:
             tasks = [(game_id, path) for game_id in self.game_ids]
 
             num_workers = 2  # Leave one CPU free
-            with Pool(processes=num_workers) as pool:
-                # Use tqdm for progress bar
-                with tqdm(total=len(tasks), desc="Processing Games") as pbar:
-                    for match_id in pool.imap_unordered(process_game, tasks):
-                        frames.append(match_id)
-                        pbar.update()
+            with stage("frames_loader.load", source="raw", num_workers=num_workers) as s:
+                with Pool(processes=num_workers) as pool:
+                    # Use tqdm for progress bar
+                    with tqdm(total=len(tasks), desc="Processing Games") as pbar:
+                        for match_id in pool.imap_unordered(process_game, tasks):
+                            frames.append(match_id)
+                            self._count_frames(s, match_id)
+                            pbar.update()
         
         self.frames = frames
 
+    @staticmethod
+    def _count_frames(s, game):
+        """Adds the rows of a loaded game (metadata, reduced metadata, players) to the stage counters."""
+        s.count("games")
+        metadata_df, metadata_df_reduced, players_df = game
+        if isinstance(metadata_df, pd.DataFrame):
+            s.count("metadata_rows", len(metadata_df))
+            s.count("reduced_rows", len(metadata_df_reduced))
+            s.count("player_rows", len(players_df))
+        else:
+            s.count("errors")
+
     def get(self) -> list[tuple[pd.DataFrame, pd.DataFrame]]:
         return self.frames
     
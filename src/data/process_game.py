@@ -6,12 +6,14 @@ import gandula
 from gandula.export.dataframe import pff_frames_to_dataframe
 from gandula.features.pff import add_ball_speed, add_players_speed
 
+from src.data.schema import apply_schema, METADATA_SCHEMA, PLAYERS_SCHEMA
+
 def load_game(args):
     """Process a single game."""
     game_id, path = args
 
     try:
-        metadata_df = pd.read_parquet(f"{path}/{game_id}/metadata.parquet")
+        metadata_df = apply_schema(pd.read_parquet(f"{path}/{game_id}/metadata.parquet"), METADATA_SCHEMA)
         
         # Reduce frame rate
         metadata_df_reduced = reduce_frame_rate(metadata_df, target_fps=5, original_fps=30)
@@ -28,7 +30,7 @@ def load_game(args):
         table = pq.read_table(f"{path}/{game_id}/players.parquet", filters=filters)
 
         # Convert to Pandas DataFrame
-        players_df = table.to_pandas()
+        players_df = apply_schema(table.to_pandas(), PLAYERS_SCHEMA)
 
         return metadata_df, metadata_df_reduced, players_df
     
@@ -55,6 +57,9 @@ def process_game(args):
     players_df = add_ball_speed(players_df)
     players_df = add_players_speed(players_df)
 
+    metadata_df = apply_schema(metadata_df, METADATA_SCHEMA)
+    players_df = apply_schema(players_df, PLAYERS_SCHEMA)
+
     return metadata_df, metadata_df_reduced, players_df
     
 def reduce_frame_rate(metadata_df, target_fps=5, original_fps=30):
@@ -72,7 +77,8 @@ def reduce_frame_rate(metadata_df, target_fps=5, original_fps=30):
     # Ensure the DataFrame is sorted by the relevant index (e.g., timestamp or frame)
     metadata_df = metadata_df.sort_values('frame_id').reset_index(drop=True)
 
-    metadata_df['frame_id'] = metadata_df['frame_id'].astype(float)
+    # no-op when the frames were loaded through the schema
+    metadata_df = apply_schema(metadata_df, METADATA_SCHEMA)
 
     
     # Identify rows where event_id or possession_id is not null
@@ -1,25 +1,36 @@
 import numpy as np
 import networkx as nx
+from scipy.spatial import Delaunay, QhullError, cKDTree
+
+# Modos de construção das arestas:
+#   'complete': todos os pares de nós (comportamento original)
+#   'knn':      cada nó ligado aos seus edge_param vizinhos mais próximos (padrão 3)
+#   'radius':   pares a no máximo edge_param metros (padrão 10)
+#   'delaunay': arestas da triangulação de Delaunay das posições
+EDGE_MODES = ('complete', 'knn', 'radius', 'delaunay')
+DEFAULT_K = 3
+DEFAULT_RADIUS = 10.0
 
 def interval_to_graph(args):
     """
     Processa um único intervalo e o transforma em um grafo NetworkX.
 
     Args:
-        args: Tuple contendo (interval_id, interval_df, fully_connected).
+        args: Tuple contendo (interval_id, interval_df, fully_connected) e, opcionalmente,
+              edges (um dos EDGE_MODES) e edge_param (k do 'knn' ou raio do 'radius').
 
     Returns:
         G: um grafo NetworkX com atributos de nós e arestas.
         interval_id: o identificador do intervalo.
     """
-    interval_id, interval_df, fully_connected = args
+    interval_id, interval_df, fully_connected, *edge_args = args
 
     # Processa nós
     node_features, node_team, node_id_map = process_nodes(interval_df)
 
     # Processa arestas
     node_ids = list(node_id_map.values())
-    edge_index, edge_attrs = process_edges(node_features, node_ids, fully_connected)
+    edge_index, edge_attrs = process_edges(node_features, node_ids, fully_connected, *edge_args)
 
     # Cria um grafo NetworkX
     # Escolha entre nx.Graph() ou nx.DiGraph() dependendo da natureza das arestas
@@ -45,9 +56,7 @@ def interval_to_graph(args):
                    team=team)
 
     # Adiciona arestas ao grafo
-    for (i, j), attr in zip(edge_index, edge_attrs):
-        distance = attr[0]
-        G.add_edge(i, j, distance=distance)
+    G.add_edges_from((i, j, {'distance': attr[0]}) for (i, j), attr in zip(edge_index, edge_attrs))
 
     return G, interval_id
 
@@ -73,20 +82,74 @@ def process_nodes(interval_df):
 
     return node_features, node_team, node_id_map
 
-def process_edges(node_features, node_ids, fully_connected):
-    """Processa as arestas e retorna índices e atributos."""
-    edge_index = []
-    edge_attrs = []
-
-    for i in node_ids:
-        for j in node_ids:
-            if i != j:
-                # Verifica se o grafo é fully_connected ou apenas nós do mesmo time
-                if fully_connected or node_features[i][4] == node_features[j][4]:
-                    xi, yi = node_features[i][0], node_features[i][1]
-                    xj, yj = node_features[j][0], node_features[j][1]
-                    distance = calculate_distance(xi, yi, xj, yj)
-                    edge_index.append((i, j))
-                    edge_attrs.append([distance])
+def _edge_pairs(positions, edges, edge_param):
+    """Pares (i, j) de um grupo de nós segundo o modo de construção das arestas."""
+    n = len(positions)
+    if n < 2:
+        return np.empty((0, 2), dtype=int)
+
+    if edges == 'complete':
+        # ambos os sentidos, na mesma ordem do laço original
+        i, j = np.nonzero(~np.eye(n, dtype=bool))
+        return np.column_stack([i, j])
+
+    if edges == 'knn':
+        k = min(int(edge_param or DEFAULT_K), n - 1)
+        # o primeiro vizinho é o próprio nó
+        _, neighbours = cKDTree(positions).query(positions, k=k + 1)
+        i = np.repeat(np.arange(n), k)
+        j = neighbours[:, 1:].ravel()
+        pairs = np.column_stack([np.minimum(i, j), np.maximum(i, j)])
+        return np.unique(pairs, axis=0)
+
+    if edges == 'radius':
+        radius = DEFAULT_RADIUS if edge_param is None else edge_param
+        return cKDTree(positions).query_pairs(radius, output_type='ndarray')
+
+    if edges == 'delaunay':
+        if n < 3:
+            return np.array([[0, 1]])
+        try:
+            indptr, indices = Delaunay(positions).vertex_neighbor_vertices
+        except QhullError:
+            # posições colineares: liga os nós consecutivos ao longo da reta
+            order = np.lexsort((positions[:, 1], positions[:, 0]))
+            return np.sort(np.column_stack([order[:-1], order[1:]]), axis=1)
+        i = np.repeat(np.arange(n), np.diff(indptr))
+        return np.column_stack([i, indices])[i < indices]
+
+    raise ValueError(f"Invalid edges mode: {edges}")
+
+def process_edges(node_features, node_ids, fully_connected, edges='complete', edge_param=None):
+    """
+    Processa as arestas e retorna índices e atributos.
+
+    Com fully_connected=False as arestas ligam apenas nós do mesmo time. Os modos 'knn', 'radius' e
+    'delaunay' (ver EDGE_MODES) geram um grafo de vizinhança com uma aresta por par, em vez de
+    todos os pares de nós.
+    """
+    if edges is None:
+        edges = 'complete'
+    if edges not in EDGE_MODES:
+        raise ValueError(f"Invalid edges mode. Choose between {', '.join(EDGE_MODES)}.")
+    features = np.asarray(node_features, dtype=float).reshape(-1, 5)
+    node_ids = np.asarray(node_ids, dtype=int)
+    positions = features[node_ids, :2]
+
+    if fully_connected:
+        groups = [np.arange(len(node_ids))]
+    else:
+        team = features[node_ids, 4]
+        groups = [np.flatnonzero(team == value) for value in np.unique(team)]
+
+    pairs = [group[_edge_pairs(positions[group], edges, edge_param)] for group in groups]
+    pairs = np.concatenate(pairs) if pairs else np.empty((0, 2), dtype=int)
+    if edges == 'complete' and not fully_connected:
+        # mesma ordem do laço original (por nó de origem)
+        pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+    distances = np.hypot(*(positions[pairs[:, 0]] - positions[pairs[:, 1]]).T)
+    edge_index = list(zip(node_ids[pairs[:, 0]].tolist(), node_ids[pairs[:, 1]].tolist()))
+    edge_attrs = [[distance] for distance in distances.tolist()]
 
     return edge_index, edge_attrs
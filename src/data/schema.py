@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+# Compact dtypes of the tracking DataFrames, fixed once when a game is loaded and kept
+# through the pipeline. Coordinates fit float32 (centimetre precision on the pitch) and
+# frame numbers fit int32 (and are exact in float32 up to 2**24, ~6 days at 30 fps), so
+# nullable frame references (event/possession start and end) are stored as float32.
+# elapsed_seconds stays float64: in float32 frames right after a 120 s boundary round
+# below it and move to the previous interval.
+COORDINATES = 'float32'
+FRAME = 'int32'
+NULLABLE_FRAME = 'float32'
+
+PLAYERS_SCHEMA = {
+    'match_id': 'int32',
+    'frame_id': FRAME,
+    'period': 'int8',
+    'team': pd.CategoricalDtype(['home', 'away']),
+    'shirt': 'int16',
+    'x': COORDINATES,
+    'y': COORDINATES,
+    'vx': COORDINATES,
+    'vy': COORDINATES,
+    'speed': COORDINATES,
+}
+
+METADATA_SCHEMA = {
+    'match_id': 'int32',
+    'frame_id': FRAME,
+    'period': 'int8',
+    'ball_x': COORDINATES,
+    'ball_y': COORDINATES,
+    'ball_z': COORDINATES,
+    'ball_vx': COORDINATES,
+    'ball_vy': COORDINATES,
+    'ball_speed': COORDINATES,
+    'event_id': 'float64',
+    'possession_id': 'float64',
+    'event_start_frame': NULLABLE_FRAME,
+    'event_end_frame': NULLABLE_FRAME,
+    'possession_start_frame': NULLABLE_FRAME,
+    'possession_end_frame': NULLABLE_FRAME,
+    'event_type': 'category',
+    'event_setpiece_type': 'category',
+}
+
+
+def _cast(column, dtype):
+    """Casts a column, parsing strings for numeric targets and keeping NaN for integer ones."""
+    if isinstance(dtype, pd.CategoricalDtype) or dtype == 'category':
+        if isinstance(dtype, pd.CategoricalDtype) and dtype.categories is not None:
+            if not set(column.dropna().unique()) <= set(dtype.categories):
+                return column.astype('category')
+        return column.astype(dtype)
+
+    if column.dtype == object:
+        column = pd.to_numeric(column)
+    if np.issubdtype(np.dtype(dtype), np.integer) and column.isna().any():
+        # missing values cannot be stored in a numpy integer column
+        return column.astype(NULLABLE_FRAME if dtype == FRAME else 'float64')
+    return column.astype(dtype)
+
+
+def apply_schema(df, schema):
+    """
+    Casts the columns of df present in schema to their compact dtype.
+
+    Columns already in the target dtype are not copied, so calling it again on a DataFrame that
+    went through it costs only the dtype checks.
+
+    Args:
+        df (pd.DataFrame): Tracking DataFrame (players or metadata).
+        schema (dict): Column -> dtype, e.g. PLAYERS_SCHEMA or METADATA_SCHEMA.
+
+    Returns:
+        pd.DataFrame: df itself if no column changed, otherwise a DataFrame with the cast columns.
+    """
+    changes = {}
+    for column, dtype in schema.items():
+        if column not in df.columns:
+            continue
+        current = df[column].dtype
+        if dtype == 'category':
+            if isinstance(current, pd.CategoricalDtype):
+                continue
+        elif current == dtype:
+            continue
+        changes[column] = _cast(df[column], dtype)
+
+    if not changes:
+        return df
+    return df.assign(**changes)
+
+
+def to_str(series):
+    """
+    Same values as series.astype(str), but categorical columns stay categorical and only their
+    categories are converted (missing values become the category 'nan').
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(str)
+    series = series.cat.rename_categories(series.cat.categories.astype(str))
+    if series.isna().any():
+        if 'nan' not in series.cat.categories:
+            series = series.cat.add_categories('nan')
+        series = series.fillna('nan')
+    return series
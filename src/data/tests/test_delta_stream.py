@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.delta_stream import DeltaGraphStream
+from src.data.process_graphs import interval_to_graph
+
+
+def _frames(n_frames=250, seed=0):
+    """Frame graphs of 22 moving players; one player leaves halfway, so the topology changes."""
+    rng = np.random.default_rng(seed)
+    positions = rng.uniform(0, 100, size=(22, 2))
+    team = np.repeat(['home', 'away'], 11)
+    graphs = []
+    for frame in range(n_frames):
+        velocity = rng.normal(0, 1, size=(22, 2))
+        positions = positions + velocity
+        players = 22 if frame < n_frames // 2 else 21
+        frame_df = pd.DataFrame({
+            'x': positions[:players, 0],
+            'y': positions[:players, 1],
+            'vx': velocity[:players, 0],
+            'vy': velocity[:players, 1],
+            'home_has_possession': (frame // 40) % 2 == 0,
+            'team': team[:players],
+        })
+        graphs.append(interval_to_graph((1000 + frame, frame_df, True)))
+    return graphs
+
+
+def _same(G, H):
+    return (
+        type(G) is type(H)
+        and G.graph == H.graph
+        and list(G.nodes(data=True)) == list(H.nodes(data=True))
+        and list(G.edges(data=True)) == list(H.edges(data=True))
+    )
+
+
+def test_decodes_back_to_the_same_graphs():
+    graphs = _frames()
+    stream = DeltaGraphStream(graphs, keyframe_interval=50)
+
+    assert len(stream) == len(graphs)
+    # 125 frames per topology, at most 50 per block
+    assert stream.n_keyframes == 6
+    for (G, interval_id), (H, decoded_id) in zip(graphs, stream):
+        assert decoded_id == interval_id
+        assert _same(G, H)
+
+
+def test_random_access():
+    graphs = _frames(n_frames=120)
+    stream = DeltaGraphStream(graphs, keyframe_interval=32)
+
+    for idx in (0, 31, 32, 59, 60, 119, -1, -120):
+        G, interval_id = graphs[idx]
+        H, decoded_id = stream[idx]
+        assert decoded_id == interval_id
+        assert _same(G, H)
+        assert _same(G, stream.get(interval_id))
+    assert [interval_id for _, interval_id in stream[10:20:3]] == [1010, 1013, 1016, 1019]
+    with pytest.raises(IndexError):
+        stream[len(graphs)]
+
+
+def test_float32_keeps_topology_and_is_close():
+    graphs = _frames(n_frames=60)
+    stream = DeltaGraphStream(graphs, dtype='float32')
+    assert stream.nbytes < DeltaGraphStream(graphs).nbytes
+
+    for (G, _), (H, _) in zip(graphs, stream):
+        assert list(G.nodes) == list(H.nodes)
+        assert list(G.edges) == list(H.edges)
+        for node, data in G.nodes(data=True):
+            assert H.nodes[node]['team'] == data['team']
+            assert H.nodes[node]['ball_team'] == data['ball_team']
+            assert np.allclose([H.nodes[node][k] for k in ('x', 'y', 'vx', 'vy')],
+                               [data[k] for k in ('x', 'y', 'vx', 'vy')], rtol=1e-6)
+        assert np.allclose([d for *_, d in H.edges(data='distance')],
+                           [d for *_, d in G.edges(data='distance')], rtol=1e-6)
@@ -12,88 +12,68 @@
 
 from pylab import *
 
-import os
 import networkx as nx
 import math
 from random import shuffle
-from .change_detection import ChangeDetection
-from properties import RULSIF, Experiment, GBAD
+from collections import deque
+from .change_detection import ChangeDetection, OnlineChangeDetection
+from .subgraph_mining import mine_subgraphs
+from .threshold import DynamicThreshold
+from .properties import RULSIF, Experiment
 
 class DriftDetector:
-    is_isomorphic = False
-    subgraph_id = 1
-    S_w = {}
-
 
     def __init__(self):
-        # remove graph file if exist
-        #print("Subgraph_id: ", self.subgraph_id)
-        #print("S_w: ", self.S_w)
-        self.S_w.clear()
-        self.is_isomorphic = False
-        self.subgraph_id = 1
-        #print("\n\n\nClear S_w: ", self.S_w, self.subgraph_id, self.is_isomorphic)
+        # every detector owns its window state, so several detections can run in the same process
         self.subgraph_id = 1
+        self.S_w = {}
+        self.S_index = {}        #canonical subgraph key -> id in S_w
+        self.S_key = {}          #id in S_w -> canonical subgraph key
+        self.S_expiry = deque()  #(graphCount, [ids]) in insertion order, for window expiry
+        self.S_stats = {}        #id in S_w -> [sum of counts, sum of count*log2(count), number of entries]
+        self.entropy_total = 0   #sum of counts over subgraphs present in more than one graph
+        self.entropy_sum = 0.0   #sum of (T*log2(T) - sum c*log2(c)) over the same subgraphs
         print("Starting Drift Detection-----")
 
-        try:
-            os.remove(GBAD.graph_folder + "/G.g")
-            os.remove(GBAD.graph_folder + "/subgraph.g")
-        except OSError:
-            pass
+    def close(self):
+        # subgraphs are mined in process (subgraph_mining), there are no graph files to remove
+        pass
 
+    def __enter__(self):
+        return self
 
-    @staticmethod
-    def get_subgraph_count(subgraph):
-        '''
-        # ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** **
-        # NAME: getTotalSubgraphCount
-        #
-        # INPUTS: (subgraph) List of subgraph in this window
-        #
-        # RETURN: (total) count of total subgraph
-        #
-        # PURPOSE: Get the total count of subgraph in current window  for calculating Entropy
-        #
-        # ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** **
-        :param subgraph:
-        :return:
-        '''
-        s_count = 0
-        for s in subgraph:
-            s_count += s[0]
-        return s_count
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
 
-    @staticmethod
-    def get_total_count():
+    def update_entropy_stats(self, id, count, sign):
         '''
-        # ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** **
-        # NAME: getTotalCount
-        #
-        # INPUTS: ()
-        #
-        # RETURN: (total, pos, neg) Count of total subgraph, instances of positive and negative subgraph
-        #
-        # PURPOSE: Get the total count of subgraph in a multiple window considered for calculating Entropy
-        #
-        # ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** **
-        :return:
+        Add (sign = 1) or remove (sign = -1) one frequency entry of subgraph id from the entropy accumulators.
+        Only subgraphs with more than one entry contribute to the window entropy.
         '''
-        total = 0
-        for id in DriftDetector.S_w.keys():
-            #sg_list = DriftDetector.subgraph_list[id]
-            #print ("ID List: ", DriftDetector.subgraph_list[id])
-            if len(DriftDetector.S_w[id][1:]) > 1:
-                for list in DriftDetector.S_w[id][1:]:
-                    # print(" inner list: ", list)
-                    total += int(list[0])
-                    #print(total)
-        return total
+        stats = self.S_stats.get(id)
+        if stats is None:
+            stats = self.S_stats[id] = [0, 0.0, 0]
 
+        if stats[2] > 1:
+            self.entropy_total -= stats[0]
+            self.entropy_sum -= stats[0] * math.log2(stats[0]) - stats[1]
 
-    @staticmethod
-    def get_window_entropy():
+        stats[0] += sign * count
+        stats[1] += sign * (count * math.log2(count) if count > 0 else 0)
+        stats[2] += sign
+
+        if stats[2] > 1:
+            self.entropy_total += stats[0]
+            self.entropy_sum += stats[0] * math.log2(stats[0]) - stats[1]
+        elif stats[2] == 0:
+            del self.S_stats[id]
+
+        if self.entropy_total == 0:
+            self.entropy_sum = 0.0  #drop accumulated rounding error when the window is empty
+
+
+    def get_window_entropy(self):
         '''
         # ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** **
         # NAME: getWindowEntropy
@@ -109,146 +89,39 @@ class DriftDetector:
         :param subgraph:
         :return:
         '''
+        # With T = sum of counts of a subgraph and c its count in each graph:
+        #   -pS * sum (c/T) log2(c/T) = (T log2 T - sum c log2 c) / total
+        # both terms are kept up to date by update_entropy_stats as counts are added or expired.
+        #If subgraph is only present in one Graph (Gi) then entropy is zero
         eW = 0
-        total = DriftDetector.get_total_count()
-        #print("Total: ", total)
-        for id in list(DriftDetector.S_w.keys()):
-            #If subgraph is only present in one Graph (Gi) then entropy is zero
-            if len(DriftDetector.S_w[id][1:]) > 1:
-                #print("S List: ", DriftDetector.S_w[id])
-                eSi = 0
-                pS = 0
-                s_total = DriftDetector.get_subgraph_count(DriftDetector.S_w[id][1:])
-                #print("S total: ", s_total)
-                for S in DriftDetector.S_w[id][1:]:
-                    #print("S: ", S[0], "S_ Total: ", s_total)
-                    PsGi = S[0] / s_total
-                    eSi += PsGi * math.log2(PsGi)
-
-                #print("Esi: ", eSi)
-                pS = s_total/total
-                eW += -1 * pS * eSi
+        if self.entropy_total > 0:
+            eW = self.entropy_sum / self.entropy_total
         #print("Entropy of Window: ", eW)
         return eW
 
 
-    '''
-    @staticmethod
-    def save_graph_file(message, graphCount, param_n, param_w, dataset_name):
-
-        # ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** **
-        # NAME: saveGBADGraphFile()
-        #
-        # INPUTS: (message) Json message stream received from sender
-        #
-        # RETURN: (fileName)
-        #
-        # PURPOSE: Save the received JSON Graph file as a GBAD format graph
-        #
-        # ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** **
-
-        #:param message:
-        #:return:
-
-        fileName = GBAD.graph_folder + "/" +dataset_name + '_' + str(param_n) + '_' + str(param_w) + '.g'
-        fw = open(fileName, "w")
-        fw.write("XP # 1 //" + str(graphCount) + "\n")
-        for key in message['node']:
-            fw.write("v " + key + " \"" + message['node'][key] + "\"\n")
-        for key in message['edge']:
-            k = key.split(' ', 1)
-            if message['edge'][key]:
-                fw.write("d " + k[0] + " " + k[1] + " \"" + message['edge'][key] + "\"\n")
-            else:
-                fw.write("d " + k[0] + " " + k[1] + "\n")
-
-        return fileName
-
-    @staticmethod
-    def read_subgraph(subgraphFile):
-        # This is to read in networkx format
-        s = {}
-        instance = 0
-        with open(subgraphFile) as f:
-            lines = f.readlines()
-            for l in lines:
-                item = l.split(' ')
-                if l == "\n":
-                    s[sub_graph] = instance  # insert total instance count, new window and old window..  old window 0 this time
-                elif item[0] == 'S':
-                    sub_graph = nx.DiGraph()
-                    instance = int(item[1].strip('\n').strip(' '))
-                elif item[0] == 'v':
-                    sub_graph.add_node(item[1], label=item[2].strip('\n').strip('\"'))
-                elif item[0] == 'u' or item[0] == 'd':
-                    sub_graph.add_edge(item[1], item[2], label=item[3].strip('\n').strip('\"'))
-        return s
-
-    @staticmethod
-    def get_discriminative_subgraph(graph_file, param_n, param_w, dataset_name):
-        subgraph_file = GBAD.graph_folder + "/" + "SG_" + dataset_name + '_' + str(param_n) + '_' + str(param_w) + '.g'
-        output_file = GBAD.graph_folder + "/" + "out_" + dataset_name + '_' + str(param_n) + '_' + str(param_w) + '.txt'
-        try:
-            os.remove(subgraph_file)
-            os.remove(output_file)
-        except OSError:
-            pass
-
-        command = GBAD.gbad_home + "/" + GBAD.run_command + " -nsubs " + str(param_n)+ " -out " + subgraph_file + " " + graph_file + ">>"+output_file
-
-        #print(command)
-        os.system(command)
-        #print("Finish GBAD")
-        return DriftDetector.read_subgraph(subgraph_file)
-    '''
-
-    @staticmethod
-    def match_edge(G1, G2):
-        #print("Inside match edge")
-        match = []
-        if len(list(G1.edges(data=True))) == len(list(G2.edges(data=True))):
-            for edge in list(G1.edges(data=True)):
-                match.append(False)
-            index = 0
-            for i, e1 in enumerate(G1.edges(data=True)):
-                for j, e2 in enumerate(G2.edges(data=True)):
-                    if e1[2]['label'] == e2[2]['label']:
-                        if (e1[0] == e2[0] or e1[0] == e2[1]):
-                            if (e1[1] == e2[0] or e1[1] == e2[1]):
-                                match[i] = True
-                                break
-            # print(set(match))
-            if set(match) == set([True]):
-                #print("Match Edges", )
-                #print(G1.edges(data=True))
-                #print(G2.edges(data=True))
-                return True
-        return False
-
-    @staticmethod
-    def match_node(G1, G2):
-        match = []
-        if len(list(G1.nodes(data=True))) == len(list(G2.nodes(data=True))):
-            for node in list(G1.nodes(data=True)):
-                match.append(False)
-            index = 0
-            for i, n1 in enumerate(G1.nodes(data=True)):
-                for j, n2 in enumerate(G2.nodes(data=True)):
-                    #print("Node G1 :", n1, "\nNode G2: ", n2)
-                    if n1[1]['label'] == n2[1]['label']:
-                        if n1[0] == n2[0]:
-                            match[i] = True
-                            break
-            # print(set(match))
-            if set(match) == set([True]):
-                #print("Match Nodes: \n", )
-                #print(G1.nodes(data=True))
-                #print(G2.nodes(data=True))
-                return True
-        return False
-
     @staticmethod
-    def update_subgraph_window(s, graphCount, param_w):
+    def subgraph_key(G):
+        '''
+        Canonical key of a labeled subgraph: two subgraphs have the same key when they have the same
+        node ids and labels and the same multiset of labeled edges (endpoint order ignored).
+
+        This is stricter than the pairwise node/edge matching the subgraph list used to be scanned
+        with, which only checked that every edge of one subgraph had some edge of the other with the
+        same label and endpoints, not a one-to-one correspondence: e.g. {1->2 x, 2->1 x} matched
+        {1->2 x, 2->1 y}. Such subgraphs are now counted separately, and the window entropy can
+        differ from the list-scan version when they occur in the same window.
+        '''
+        if not G.is_directed():
+            G = nx.DiGraph(G)
+        nodes = frozenset((n, d.get('label')) for n, d in G.nodes(data=True))
+        edges = tuple(sorted(
+            ((tuple(sorted((u, v), key=repr)), d.get('label')) for u, v, d in G.edges(data=True)),
+            key=repr
+        ))
+        return (nodes, edges)
+
+    def update_subgraph_window(self, s, graphCount, param_w):
         '''
         # ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** **
         # NAME: addWindowSubGraphToEntropySubGraphList()
@@ -264,73 +137,38 @@ class DriftDetector:
         :param s:
         :return:
         '''
-        #s_win = graphCount #GraphEntropyMethod.winCount
-        #print("S_w: ", DriftDetector.S_w)
-        # remove all subgraph from oldest window
-        for id in list(DriftDetector.S_w.keys()):
-            #print("I:  -- ", DriftDetector.S_w[id][1:])
-            #Find Frequency and window number
-            filters = list(
-                filter(lambda x: param_w <= graphCount - x[1],
-                       DriftDetector.S_w[id][1:]))
-
-            #Remove frequency entry from selected filters
-            DriftDetector.S_w[id] =  [x for x in DriftDetector.S_w[id] if x not in filters]
-
-            if len(DriftDetector.S_w[id]) == 1: #if it has only subgraph but no frequency
-                #print("When is it here?")
-                del DriftDetector.S_w[id]
-
-        #print("After Deletion S_w: ", DriftDetector.S_w)
-        # add all subgraph to entropy subgraph list till subgraph list is full
-        count_array = []
+        # remove all subgraph from oldest window, windows expire in insertion order
+        while self.S_expiry and param_w <= graphCount - self.S_expiry[0][0]:
+            (w_count, ids) = self.S_expiry.popleft()
+            for id in ids:
+                if id not in self.S_w:
+                    continue
+                #Remove frequency entry of the expired window, entries are kept in window order
+                freq = self.S_w[id]
+                while len(freq) > 1 and param_w <= graphCount - freq[1][1]:
+                    self.update_entropy_stats(id, freq[1][0], -1)
+                    del freq[1]
+
+                if len(freq) == 1: #if it has only subgraph but no frequency
+                    del self.S_index[self.S_key.pop(id)]
+                    del self.S_w[id]
+
+        # add all subgraph to entropy subgraph list, matching subgraph count are merged together
+        ids = []
         for sg in s.keys():
-            s1 = nx.DiGraph(sg)
-            #print("New Subgraph: ", s1.nodes())
-            if len(DriftDetector.S_w) > 0:
-                #print("Exisiting SW")
-                #print("List: ", DriftDetector.S_w)
-                for id in list(DriftDetector.S_w.keys()):
-                    #print("Sg: ", GraphEntropyMethod.subgraph_list[id])
-                    #print("Sg Graph: ", GraphEntropyMethod.subgraph_list[id][0])
-                    #for isomorphic_graph_info in GraphEntropyMethod.subgraph_list[id]:
-                    if 1 == 1:
-                        s2 = nx.DiGraph(DriftDetector.S_w[id][0])
-                        # GM = isomorphism.GraphMatcher(s1, s2)
-                        # if GM.is_isomorphic():
-                        #key = list(d.keys())[0]
-                        #print("S2 Node: ", s2.nodes(), " S2 Edges: ", s2.edges())
-                        if DriftDetector.match_node(s1, s2) and DriftDetector.match_edge(s1, s2):
-                            DriftDetector.is_isomorphic = True
-                            #print("Isomorphic Graphs--", id, "\nNode S1  ", nx.get_node_attributes(s1, 'label'), "  \nNode s2  ", nx.get_node_attributes(s2, 'label'))
-                            #print("Edge Match: ", GraphEntropyMethod.match_edge(s1, s2))
-
-                            #print("\nEdges S1: ", nx.get_edge_attributes(s1, 'label'), "\nEdges S2: ", nx.get_edge_attributes(s2, 'label'))
-                            DriftDetector.S_w[id].append([s[sg], graphCount])
-                            break
-                        else:
-                            DriftDetector.is_isomorphic = False
-
-                    if DriftDetector.is_isomorphic:
-                        break
-
-            #print("Check Isomorphic: ", DriftDetector.is_isomorphic)
-            if len(DriftDetector.S_w) == 0:
-                #print("Add First: ", s1.nodes())
-                DriftDetector.subgraph_id += 1
-                DriftDetector.S_w[DriftDetector.subgraph_id] = []
-                DriftDetector.S_w[DriftDetector.subgraph_id].append(s1)
-                DriftDetector.S_w[DriftDetector.subgraph_id].append([s[sg], graphCount])
-
-            if DriftDetector.is_isomorphic is False:
-                #print("Add First: ", s1.nodes())
-                DriftDetector.subgraph_id += 1
-                DriftDetector.S_w[DriftDetector.subgraph_id] = []
-                DriftDetector.S_w[DriftDetector.subgraph_id].append(s1)
-                DriftDetector.S_w[DriftDetector.subgraph_id].append([s[sg], graphCount])
-
-        #print("Final Subgraph List: \n", DriftDetector.S_w)
-        #print("-------------------")
+            key = DriftDetector.subgraph_key(sg)
+            id = self.S_index.get(key)
+            if id is None:
+                self.subgraph_id += 1
+                id = self.subgraph_id
+                self.S_w[id] = [nx.DiGraph(sg)]
+                self.S_index[key] = id
+                self.S_key[id] = key
+            self.S_w[id].append([s[sg], graphCount])
+            self.update_entropy_stats(id, s[sg], 1)
+            ids.append(id)
+
+        self.S_expiry.append((graphCount, ids))
 
     @staticmethod
     def get_change_score(E):
@@ -372,24 +210,13 @@ class DriftDetector:
         shuffle(a_key)
         return (b_key + a_key)
 
-    @staticmethod
-    def set_dynamic_threshold(pe_alpha, param_w):
-        if len(pe_alpha) > param_w:
-            pe_w = array(pe_alpha[len(pe_alpha) - param_w:len(pe_alpha)])
-            mean = pe_w.mean()
-            std = pe_w.std()
-            return (mean + std)
-        else:
-            return RULSIF.th
-
-
-    @staticmethod
-    def drift_detector(g_list, dataset, param_n, param_w):
+    def drift_detector(self, g_list, dataset, param_n, param_w, miner=None):
         '''
         # ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** **
         # NAME: graphEntropyMethod()
         #
-        # INPUTS: (g_list{}) Graph Stream
+        # INPUTS: (g_list{}) Graph Stream, (miner) optional function (G, param_n) -> {subgraph: count};
+        #         without it dataset.subgraph_list is used, or mine_subgraphs when there is none
         #
         # RETURN: (PE, Entropy, Drift Points and False Alarm)
         #
@@ -411,20 +238,26 @@ class DriftDetector:
         t_buffer = 2 * RULSIF.n + RULSIF.k - 1
         t_next = 2 * RULSIF.n + RULSIF.k - 1
 
+        # entropies up to e[i-1] are fed here, so score() sees the same e[i-t_buffer:i] slice
+        change_score = OnlineChangeDetection(RULSIF.n, RULSIF.k, RULSIF.alpha, RULSIF.k_fold, RULSIF.refresh)
+        threshold = DynamicThreshold(param_w, RULSIF.threshold_policy)
+
         key = DriftDetector.shuffule_graphs(list(g_list.keys()), dataset)
         t = 0
         for g_count in key:
             #print("Window Size: ", RULSIF.W)
             #print("Graph Count: ", g_count, " T: ", t)
             t += 1
-            #graphFile = DriftDetector.save_graph_file(g_list[g_count], t, param_n, param_w, dataset.dataset_name)
-
-            #get discriminative subgraph from the pre-populated list
-            s = dataset.subgraph_list[g_count]
-            #s = DriftDetector.get_discriminative_subgraph(graphFile, param_n, param_w, dataset.dataset_name)
-            #print("\n \n \n G Count: ", g_count, " T: ", t)#, " \n S_w : ", DriftDetector.S_w)
+            #get discriminative subgraph from the pre-populated list, or mine the param_n most frequent ones
+            if miner is not None:
+                s = miner(g_list[g_count], param_n)
+            elif getattr(dataset, 'subgraph_list', None) is not None:
+                s = dataset.subgraph_list[g_count]
+            else:
+                s = mine_subgraphs(g_list[g_count], param_n)
+            #print("\n \n \n G Count: ", g_count, " T: ", t)#, " \n S_w : ", self.S_w)
             #update S_w,
-            DriftDetector.update_subgraph_window(s, t, param_w)
+            self.update_subgraph_window(s, t, param_w)
 
             if t >= param_w:
 
@@ -433,7 +266,9 @@ class DriftDetector:
                     print("Starting Entropy Calculation")
 
                 i = (t - param_w)
-                e.append(DriftDetector.get_window_entropy())
+                if len(e) > 0:
+                    change_score.update(e[-1])
+                e.append(self.get_window_entropy())
 
 
                 if i >= t_buffer and i == t_next:
@@ -442,12 +277,10 @@ class DriftDetector:
                         print("Buffer Matrix Full")
                         print("Calculating diversion score")
 
-                    e_curr = e[i-t_buffer:i]
-                    #print("E Curr: ", e_curr)
-                    score = DriftDetector.get_change_score(e_curr)
+                    score = change_score.score()
                     PE.append(score)
 
-                    th = DriftDetector.set_dynamic_threshold(PE, param_w)
+                    th = threshold.update(score)
 
                     #print("Threshold: ", th)
                     if score >= th:
@@ -471,5 +304,68 @@ class DriftDetector:
 
                     #i += 1 # check if we need this
 
-        #print("Final S_w", DriftDetector.S_w)
-        return PE, e, DRIFT, FA
\ No newline at end of file
+        #print("Final S_w", self.S_w)
+        return PE, e, DRIFT, FA
+
+    def detect_stream(self, graphs, param_n, param_w, miner=None, drift_points=None):
+        '''
+        # ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** **
+        # NAME: detectStream()
+        #
+        # INPUTS: (graphs) iterable of graphs, e.g. GraphStream.get_graph_stream() ((G, interval_id) tuples)
+        #         (miner) function (G, param_n) -> {subgraph: count}, default mine_subgraphs
+        #         (drift_points) optional ground truth, alarms outside it are reported as false alarms
+        #
+        # RETURN: generator of drift events {'t', 'interval_id', 'score', 'threshold', 'type'}
+        #
+        # PURPOSE: Streaming DSDD, graphs are consumed one at a time in arrival order and only the
+        #          last 2n+k entropies and the threshold state are kept
+        #
+        # ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** ** **
+        '''
+        if miner is None:
+            miner = mine_subgraphs
+
+        change_score = OnlineChangeDetection(RULSIF.n, RULSIF.k, RULSIF.alpha, RULSIF.k_fold, RULSIF.refresh)
+        threshold = DynamicThreshold(param_w, RULSIF.threshold_policy)
+        t_buffer = 2 * RULSIF.n + RULSIF.k - 1
+        t_next = t_buffer
+        last_warn = None
+        e_prev = None
+
+        t = 0
+        for item in graphs:
+            t += 1
+            if isinstance(item, tuple):
+                G, interval_id = item[0], item[1]
+            else:
+                G, interval_id = item, getattr(item, 'graph', {}).get('interval_id', t)
+
+            self.update_subgraph_window(miner(G, param_n), t, param_w)
+
+            if t < param_w:
+                continue
+
+            i = (t - param_w)
+            if e_prev is not None:
+                change_score.update(e_prev)
+            e_prev = self.get_window_entropy()
+
+            if i >= t_buffer and i == t_next:
+                score = change_score.score()
+                th = threshold.update(score)
+
+                t_next = i + 1
+                if score >= th:
+                    event = {'t': t, 'interval_id': interval_id, 'score': score, 'threshold': th}
+                    if drift_points is None or DriftDetector.is_real_drift(t, drift_points):
+                        #other alarm till t_next are considered duplicate so skip them
+                        t_next = i + (2 * RULSIF.n + RULSIF.k)
+                        event['type'] = 'drift'
+                        yield event
+                    else:
+                        #remove duplicate False Alarm
+                        if last_warn is None or t - last_warn >= (2 * RULSIF.n + RULSIF.k):
+                            event['type'] = 'false_alarm'
+                            yield event
+                        last_warn = t
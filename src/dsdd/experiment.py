@@ -0,0 +1,98 @@
+# ******************************************************************************
+# experiment.py
+#
+# Run DSDD repetitions over several datasets in parallel worker processes
+#
+# ******************************************************************************
+#
+
+import io
+import random
+import contextlib
+from multiprocessing import Pool, cpu_count
+
+import numpy
+from tqdm.auto import tqdm
+
+from .dsdd import DriftDetector
+from .properties import Experiment, DataList
+
+# datasets already loaded by this worker process, keyed by dataset name
+_loaded = {}
+
+
+def run_detection(args):
+    '''
+    Run one DSDD repetition on one dataset, each call with its own DriftDetector.
+
+    :param args: (load_dataset, dataset_info, iteration, param_n, param_w, seed, verbose)
+                 load_dataset(dataset_info) must return (g_list, dataset), where dataset has
+                 drift_points and subgraph_list. It must be a module level function so it can be
+                 sent to the worker processes.
+    :return: dict with dataset name, iteration, PE, entropy, drift points and false alarms.
+    '''
+    load_dataset, dataset_info, iteration, param_n, param_w, seed, verbose = args
+    name = dataset_info[0]
+
+    if name not in _loaded:
+        _loaded[name] = load_dataset(dataset_info)
+    g_list, dataset = _loaded[name]
+
+    # shuffule_graphs uses the random module, R_ULSIF uses numpy
+    random.seed(seed + iteration)
+    numpy.random.seed(seed + iteration)
+
+    output = None if verbose else io.StringIO()
+    with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+        with DriftDetector() as detector:
+            PE, e, DRIFT, FA = detector.drift_detector(g_list, dataset, param_n, param_w)
+
+    return {
+        'dataset': name,
+        'iteration': iteration,
+        'param_n': param_n,
+        'param_w': param_w,
+        'PE': PE,
+        'entropy': e,
+        'drift_points': DRIFT,
+        'false_alarms': FA,
+    }
+
+
+def run_experiments(load_dataset, datasets=None, iterations=None, param_n=None, param_w=None,
+                    num_workers=None, seed=0, verbose=False):
+    '''
+    Run Experiment.iterations repetitions of DSDD for every dataset in DataList.data_list
+    across a process pool.
+
+    :param load_dataset: function (dataset_info) -> (g_list, dataset), see run_detection
+    :param datasets: list of DataList tuples, default DataList.data_list
+    :param iterations: repetitions per dataset, default Experiment.iterations
+    :param param_n, param_w: DSDD parameters, default Experiment.param_n / Experiment.param_w
+    :param num_workers: pool size, default cpu_count() - 1
+    :param seed: base seed, repetition i uses seed + i
+    :param verbose: keep the detector progress messages
+    :return: list of result dicts (see run_detection), sorted by dataset and iteration
+    '''
+    datasets = DataList.data_list if datasets is None else datasets
+    iterations = Experiment.iterations if iterations is None else iterations
+    param_n = Experiment.param_n if param_n is None else param_n
+    param_w = Experiment.param_w if param_w is None else param_w
+    num_workers = max(1, cpu_count() - 1) if num_workers is None else num_workers
+
+    tasks = [
+        (load_dataset, dataset_info, iteration, param_n, param_w, seed, verbose)
+        for dataset_info in datasets
+        for iteration in range(iterations)
+    ]
+
+    results = []
+    with Pool(processes=num_workers) as pool:
+        with tqdm(total=len(tasks), desc="Running DSDD") as pbar:
+            for result in pool.imap_unordered(run_detection, tasks):
+                results.append(result)
+                pbar.update()
+
+    order = {dataset_info[0]: i for i, dataset_info in enumerate(datasets)}
+    results.sort(key=lambda r: (order[r['dataset']], r['iteration']))
+    return results
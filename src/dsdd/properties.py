@@ -36,6 +36,13 @@ class SubDue:
     #subdueCommand = "bin/subdue "  + " -nsubs " + str(nsubs)
 
 
+class Mining:
+    min_size = 1        #Minimum pattern size (edges)
+    max_size = 3        #Maximum pattern size (edges)
+    budget = 5000       #Maximum number of subgraph instances enumerated per graph
+    min_support = 1     #Minimum instance count of a returned pattern
+
+
 class Experiment:
     iterations = 50
     param_n = 10        #Number of subgraph
@@ -49,6 +56,8 @@ class RULSIF:
     alpha = 0.1
     k_fold = 5
     th = 4.4
+    threshold_policy = 'std'    #Dynamic threshold: 'std' (mean + std), 'ewma' or 'quantile'
+    refresh = 10      #Scores between sigma/lambda re-selection (1 = full R_ULSIF every step)
 
 class DataList:
     # datasetname = (<dataset name>, <total graph>, <expected drift points>, <graph file name>, <isSyntetic (True or False)> , <param>(parameter array))
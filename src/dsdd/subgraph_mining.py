@@ -0,0 +1,136 @@
+# ******************************************************************************
+# subgraph_mining.py
+#
+# Frequent subgraph mining in process, replaces the GBAD/SubDue subprocess
+#
+# ******************************************************************************
+#
+
+from itertools import permutations, product
+from collections import defaultdict
+
+import networkx as nx
+
+from .properties import Mining
+
+
+def get_label(data, attr, default):
+    '''Label of a node/edge: attribute value if attr is a string, attr(data) if callable.'''
+    if callable(attr):
+        return str(attr(data))
+    value = data.get(attr, default) if attr is not None else default
+    return str(value)
+
+
+def canonical_code(nodes, edges):
+    '''
+    Canonical code of a small labeled directed pattern.
+
+    :param nodes: {node: label}
+    :param edges: list of (u, v, label)
+    :return: (node labels in canonical order, sorted edges as (i, j, label)) minimal over the
+             node orderings that keep node labels sorted
+    '''
+    groups = defaultdict(list)
+    for n, label in nodes.items():
+        groups[label].append(n)
+    labels = sorted(groups)
+
+    best = None
+    for perms in product(*[permutations(groups[label]) for label in labels]):
+        order = [n for perm in perms for n in perm]
+        index = {n: i for i, n in enumerate(order)}
+        code = tuple(sorted((index[u], index[v], label) for u, v, label in edges))
+        if best is None or code < best:
+            best = code
+
+    node_labels = tuple(label for label in labels for _ in groups[label])
+    return (node_labels, best)
+
+
+def code_to_graph(code):
+    '''Pattern DiGraph for a canonical code, node ids "1".."k" as in GBAD output.'''
+    node_labels, edges = code
+    S = nx.DiGraph()
+    for i, label in enumerate(node_labels):
+        S.add_node(str(i + 1), label=label)
+    for i, j, label in edges:
+        S.add_edge(str(i + 1), str(j + 1), label=label)
+    return S
+
+
+def mine_subgraphs(G, nsubs=None, min_size=None, max_size=None, budget=None, min_support=None,
+                   node_label='label', edge_label='label'):
+    '''
+    Bounded-size frequent subgraph mining over one labeled graph.
+
+    Connected edge-induced subgraphs are grown one adjacent edge at a time (up to max_size edges),
+    each distinct edge set is an instance of the pattern given by its canonical code.
+
+    :param G: nx.Graph or nx.DiGraph, node/edge labels taken from node_label/edge_label
+              (attribute name or function of the attribute dict; missing attributes give the
+              node id / an empty edge label)
+    :param nsubs: number of most frequent patterns returned (param_n of DSDD)
+    :param min_size, max_size: pattern size in edges, default Mining.min_size / Mining.max_size
+    :param budget: maximum number of instances enumerated in this graph, default Mining.budget
+    :param min_support: minimum instance count of a returned pattern, default Mining.min_support
+    :return: {pattern DiGraph: instance count}, the format update_subgraph_window expects
+    '''
+    min_size = Mining.min_size if min_size is None else min_size
+    max_size = Mining.max_size if max_size is None else max_size
+    budget = Mining.budget if budget is None else budget
+    min_support = Mining.min_support if min_support is None else min_support
+
+    if not G.is_directed():
+        G = nx.DiGraph(G)
+
+    n_label = {n: get_label(d, node_label, n) for n, d in G.nodes(data=True)}
+    edges = [(u, v, get_label(d, edge_label, '')) for u, v, d in G.edges(data=True) if u != v]
+    incident = defaultdict(list)
+    for idx, (u, v, label) in enumerate(edges):
+        incident[u].append(idx)
+        incident[v].append(idx)
+
+    counts = defaultdict(int)
+    seen = set()
+    level = []
+    for idx in range(len(edges)):
+        key = frozenset([idx])
+        seen.add(key)
+        level.append(key)
+
+    visited = 0
+    size = 1
+    while level and size <= max_size and visited < budget:
+        next_level = []
+        for edge_set in level:
+            if visited >= budget:
+                break
+            visited += 1
+
+            sub_edges = [edges[idx] for idx in edge_set]
+            if size >= min_size:
+                sub_nodes = {}
+                for u, v, label in sub_edges:
+                    sub_nodes[u] = n_label[u]
+                    sub_nodes[v] = n_label[v]
+                counts[canonical_code(sub_nodes, sub_edges)] += 1
+
+            if size < max_size:
+                frontier = {idx for u, v, label in sub_edges for idx in incident[u] + incident[v]}
+                for idx in frontier - edge_set:
+                    key = edge_set | {idx}
+                    if key not in seen:
+                        seen.add(key)
+                        next_level.append(key)
+        level = next_level
+        size += 1
+
+    frequent = sorted(
+        ((code, count) for code, count in counts.items() if count >= min_support),
+        key=lambda item: (-item[1], -len(item[0][1]), item[0])
+    )
+    if nsubs is not None:
+        frequent = frequent[:nsubs]
+
+    return {code_to_graph(code): count for code, count in frequent}
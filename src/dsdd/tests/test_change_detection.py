@@ -0,0 +1,46 @@
+import numpy as np
+
+from src.dsdd.change_detection import OnlineChangeDetection
+from src.dsdd.dsdd import DriftDetector
+from src.dsdd.properties import RULSIF
+
+
+def _entropies(size, seed=0):
+    rng = np.random.default_rng(seed)
+    half = size // 2
+    return np.r_[rng.normal(1.0, 0.1, half), rng.normal(1.5, 0.2, size - half)]
+
+
+def test_refresh_one_matches_the_batch_score():
+    E = _entropies(2 * RULSIF.n + RULSIF.k + 20)
+    online = OnlineChangeDetection(RULSIF.n, RULSIF.k, RULSIF.alpha, RULSIF.k_fold, refresh=1)
+    length = 2 * RULSIF.n + RULSIF.k - 1
+    scored = 0
+    for i, value in enumerate(E):
+        online.update(value)
+        if not online.is_ready():
+            continue
+        # R_ULSIF sorteia os folds da validação cruzada
+        np.random.seed(i)
+        score = online.score()
+        np.random.seed(i)
+        expected = DriftDetector.get_change_score(E[i + 1 - length:i + 1])
+        assert np.isclose(score, expected)
+        scored += 1
+    assert scored == len(E) - length + 1
+
+
+def test_incremental_terms_match_a_rebuild():
+    E = _entropies(2 * RULSIF.n + RULSIF.k + 40, seed=1)
+    online = OnlineChangeDetection(RULSIF.n, RULSIF.k, RULSIF.alpha, RULSIF.k_fold, refresh=1000)
+    np.random.seed(0)
+    for value in E:
+        online.update(value)
+        if online.is_ready():
+            online.score()
+
+    ref, test = online.ref_slots(), online.test_slots()
+    G = online.cd.kernel_Gaussian(online.X, online.X, online.sigma)
+    assert np.allclose(online.G, G)
+    assert np.allclose(online.H_nu, G[:, test] @ G[:, test].T)
+    assert np.allclose(online.H_de, G[:, ref] @ G[:, ref].T)
@@ -0,0 +1,37 @@
+import numpy as np
+
+from src.dsdd.properties import RULSIF
+from src.dsdd.threshold import DynamicThreshold
+from src.rolling import RollingStatistics
+
+
+def test_rolling_statistics_match_numpy():
+    values = np.random.default_rng(0).normal(size=300)
+    stats = RollingStatistics(window=7)
+    for i, x in enumerate(values):
+        stats.update(x)
+        window = values[max(0, i - 6):i + 1]
+        assert np.isclose(stats.mean, window.mean())
+        assert np.isclose(stats.std, window.std())
+
+
+def test_std_threshold_is_mean_plus_std_of_last_scores():
+    param_w = 10
+    scores = np.random.default_rng(1).gamma(2.0, size=200)
+    threshold = DynamicThreshold(param_w)
+    for i, score in enumerate(scores):
+        seen = scores[:i + 1]
+        if len(seen) > param_w:
+            window = seen[-param_w:]
+            expected = window.mean() + window.std()
+        else:
+            expected = RULSIF.th
+        assert np.isclose(threshold.update(score), expected)
+
+
+def test_quantile_threshold_tracks_the_quantile():
+    scores = np.random.default_rng(2).normal(size=5000)
+    threshold = DynamicThreshold(10, policy='quantile', quantile=0.9)
+    for score in scores:
+        value = threshold.update(score)
+    assert abs(value - np.quantile(scores, 0.9)) < 0.05
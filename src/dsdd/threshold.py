@@ -0,0 +1,121 @@
+# ******************************************************************************
+# threshold.py
+#
+# Dynamic alarm threshold over the change score series, constant cost per score
+#
+# ******************************************************************************
+#
+
+import math
+
+from src.rolling import RollingStatistics
+from .properties import RULSIF
+
+
+class P2Quantile:
+    '''
+    Streaming quantile estimate with the P-square algorithm (Jain & Chlamtac, 1985):
+    five markers, O(1) time and memory per value.
+    '''
+
+    def __init__(self, p):
+        self.p = p
+        self.q = []
+        self.n = [0, 1, 2, 3, 4]
+        self.np = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+        self.dn = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def update(self, x):
+        if len(self.q) < 5:
+            self.q.append(x)
+            self.q.sort()
+            return self
+
+        q, n = self.q, self.n
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.np[i] += self.dn[i]
+
+        for i in range(1, 4):
+            d = self.np[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+                    (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not q[i - 1] < qp < q[i + 1]:
+                    qp = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = qp
+                n[i] += d
+        return self
+
+    @property
+    def value(self):
+        if len(self.q) < 5:
+            if not self.q:
+                return None
+            return self.q[min(len(self.q) - 1, int(round(self.p * (len(self.q) - 1))))]
+        return self.q[2]
+
+
+class DynamicThreshold:
+    '''
+    Alarm threshold updated once per change score.
+
+    policy 'std':      mean + population std of the last param_w scores (windowed Welford on a
+                       ring buffer, src.rolling.RollingStatistics)
+    policy 'ewma':     EWMA mean + EWMA standard deviation of the scores
+    policy 'quantile': streaming quantile of the scores (P-square sketch)
+
+    Until more than param_w scores were seen the default threshold (RULSIF.th) is returned.
+    '''
+
+    def __init__(self, param_w, policy='std', default=None, ewma_alpha=0.1, quantile=0.95):
+        if policy not in ('std', 'ewma', 'quantile'):
+            raise ValueError("Invalid policy. Choose between 'std', 'ewma' or 'quantile'.")
+        self.param_w = param_w
+        self.policy = policy
+        self.default = RULSIF.th if default is None else default
+        self.ewma_alpha = ewma_alpha
+        self.count = 0
+
+        self.rolling = RollingStatistics(param_w)
+        self.ewm_mean = None
+        self.ewm_var = 0.0
+        self.sketch = P2Quantile(quantile)
+
+    def update(self, score):
+        '''Add a change score and return the threshold to compare it with.'''
+        self.count += 1
+
+        if self.policy == 'std':
+            self.rolling.update(score)
+            value = self.rolling.mean + self.rolling.std
+        elif self.policy == 'ewma':
+            if self.ewm_mean is None:
+                self.ewm_mean = score
+            else:
+                diff = score - self.ewm_mean
+                incr = self.ewma_alpha * diff
+                self.ewm_mean += incr
+                self.ewm_var = (1 - self.ewma_alpha) * (self.ewm_var + diff * incr)
+            value = self.ewm_mean + math.sqrt(self.ewm_var)
+        else:
+            value = self.sketch.update(score).value
+
+        if self.count > self.param_w:
+            return value
+        return self.default
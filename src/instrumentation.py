@@ -0,0 +1,262 @@
+"""
+Lightweight per-stage instrumentation of the pipeline.
+
+    from src import instrumentation
+
+    instrumentation.configure(path='logs/stages.jsonl', sample_interval=0.05, profile=['graph_stream'])
+
+    with instrumentation.stage('my_stage', match_id=10) as s:
+        ...
+        s.count('rows', len(df))
+
+Each stage records its wall time, CPU time, counters and peak RSS and, if a path is configured,
+appends one JSON line per stage. Stages listed in `profile` (or all of them with profile=True)
+are run under cProfile (or pyinstrument) and the profile is written to profile_dir.
+
+The configuration can also come from the environment: PIPELINE_METRICS (JSON lines path),
+PIPELINE_PROFILE ('1' for every stage or a comma separated list of stage names),
+PIPELINE_PROFILE_DIR and PIPELINE_RSS_INTERVAL (seconds).
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+class Config:
+    path = os.environ.get('PIPELINE_METRICS')
+    profile = os.environ.get('PIPELINE_PROFILE')
+    profiler = 'cprofile'
+    profile_dir = os.environ.get('PIPELINE_PROFILE_DIR', 'profiles')
+    sample_interval = float(os.environ.get('PIPELINE_RSS_INTERVAL', 0))
+    keep = 1000
+
+
+# last stage records of this process, newest last
+records = []
+
+_lock = threading.Lock()
+_depth = threading.local()
+
+
+def configure(path=None, profile=None, profiler=None, profile_dir=None, sample_interval=None, keep=None):
+    """
+    Changes the instrumentation settings (arguments left as None are kept).
+
+    :param path: JSON lines file receiving one record per stage ('' disables the output).
+    :param profile: True/False, or a list of stage names to profile.
+    :param profiler: 'cprofile' or 'pyinstrument'.
+    :param profile_dir: Folder of the profile files.
+    :param sample_interval: Seconds between RSS samples of the background sampler (0 disables it,
+                            the peak is then the process high-water mark).
+    :param keep: Number of records kept in memory.
+    """
+    if path is not None:
+        Config.path = path or None
+    if profile is not None:
+        Config.profile = profile
+    if profiler is not None:
+        if profiler not in ('cprofile', 'pyinstrument'):
+            raise ValueError("Invalid profiler. Choose between 'cprofile' or 'pyinstrument'.")
+        Config.profiler = profiler
+    if profile_dir is not None:
+        Config.profile_dir = profile_dir
+    if sample_interval is not None:
+        Config.sample_interval = sample_interval
+    if keep is not None:
+        Config.keep = keep
+
+
+def current_rss():
+    """Resident set size of this process in bytes (None if unknown)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def max_rss():
+    """Peak resident set size of this process in bytes (None if unknown)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+
+class RSSSampler(threading.Thread):
+    """Background thread sampling the RSS every `interval` seconds and keeping the peak."""
+
+    def __init__(self, interval):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = current_rss()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            rss = current_rss()
+            if rss is not None and (self.peak is None or rss > self.peak):
+                self.peak = rss
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        rss = current_rss()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+        return self.peak
+
+
+def _should_profile(name):
+    profile = Config.profile
+    if not profile or profile in ('0', 'false', 'False'):
+        return False
+    if profile is True or profile in ('1', 'true', 'True'):
+        return True
+    names = profile.split(',') if isinstance(profile, str) else profile
+    return name in names
+
+
+class _Profiler:
+    """cProfile or pyinstrument profile of one stage, saved to Config.profile_dir."""
+
+    def __init__(self, name):
+        self.name = name
+        self.kind = Config.profiler
+        if self.kind == 'pyinstrument':
+            from pyinstrument import Profiler
+            self.profiler = Profiler()
+        else:
+            import cProfile
+            self.profiler = cProfile.Profile()
+
+    def start(self):
+        if self.kind == 'pyinstrument':
+            self.profiler.start()
+        else:
+            self.profiler.enable()
+
+    def stop(self):
+        os.makedirs(Config.profile_dir, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        if self.kind == 'pyinstrument':
+            self.profiler.stop()
+            path = os.path.join(Config.profile_dir, f'{self.name}-{stamp}.html')
+            with open(path, 'w') as f:
+                f.write(self.profiler.output_html())
+        else:
+            self.profiler.disable()
+            path = os.path.join(Config.profile_dir, f'{self.name}-{stamp}.prof')
+            self.profiler.dump_stats(path)
+        return path
+
+
+class Stage:
+    """Counters and extra fields of a running stage."""
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+        self.counters = {}
+
+    def count(self, key, n=1):
+        self.counters[key] = self.counters.get(key, 0) + int(n)
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+
+def _to_json(value):
+    # numpy scalars become Python numbers, anything else its string
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+def _emit(record):
+    with _lock:
+        records.append(record)
+        del records[:-Config.keep]
+        if Config.path:
+            folder = os.path.dirname(Config.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            with open(Config.path, 'a') as f:
+                f.write(json.dumps(record, default=_to_json) + '\n')
+
+
+@contextmanager
+def stage(name, **fields):
+    """
+    Times a pipeline stage and records its counters and memory use.
+
+    :param name: Stage name.
+    :param fields: Extra fields stored in the record (e.g. match_id).
+    :return: Stage object, use `count(key, n)` to add to a counter.
+    """
+    current = Stage(name, dict(fields))
+    depth = getattr(_depth, 'value', 0)
+    _depth.value = depth + 1
+
+    sampler = None
+    if Config.sample_interval > 0:
+        sampler = RSSSampler(Config.sample_interval)
+        sampler.start()
+    profiler = _Profiler(name) if _should_profile(name) else None
+
+    started = datetime.now(timezone.utc).isoformat()
+    rss_start = current_rss()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    if profiler is not None:
+        profiler.start()
+
+    error = None
+    try:
+        yield current
+    except BaseException as e:
+        error = repr(e)
+        raise
+    finally:
+        if profiler is not None:
+            profile_path = profiler.stop()
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        _depth.value = depth
+
+        record = {
+            'stage': name,
+            'start': started,
+            'depth': depth,
+            'wall_time': wall,
+            'cpu_time': cpu,
+            'rss_start': rss_start,
+            'rss_end': current_rss(),
+            'peak_rss': sampler.stop() if sampler is not None else max_rss(),
+            'counters': current.counters,
+            'pid': os.getpid(),
+        }
+        record.update(current.fields)
+        if profiler is not None:
+            record['profile'] = profile_path
+        if error is not None:
+            record['error'] = error
+        _emit(record)
+
+
+def read_records(path=None):
+    """Reads a JSON lines file written by the stages into a DataFrame (one row per stage)."""
+    import pandas as pd
+
+    with open(path or Config.path) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    df = pd.json_normalize(rows)
+    return df.rename(columns=lambda c: c.replace('counters.', ''))
@@ -2,8 +2,12 @@ import networkx as nx
 from scipy.stats import wasserstein_distance
 from networkx.algorithms.community import modularity, greedy_modularity_communities
 import numpy as np
+import pandas as pd
+from collections import defaultdict, deque
 from tqdm.auto import tqdm
 
+from src.instrumentation import stage
+
 def calculate_simrank(graph, C=0.9, max_iter=250, tol=1e-5):
     """
     Calcula o SimRank para um grafo direcionado ou não.
@@ -66,6 +70,286 @@ def calculate_modularity(G):
     return modularity(G, communities)
 
 
+def _move_nodes(partition, nodes, out_adj, in_adj, k_out, k_in, m, gamma, max_evaluations, new_label):
+    """
+    Movimentos locais do Louvain sobre uma representação direcionada ponderada (grafos não
+    direcionados com arcos nos dois sentidos), partindo apenas dos nós em `nodes`: quando um nó
+    muda de comunidade, seus vizinhos entram na fila. Altera `partition` no lugar e retorna o
+    número de movimentos.
+    """
+    out_tot = defaultdict(float)
+    in_tot = defaultdict(float)
+    for u, c in partition.items():
+        out_tot[c] += k_out[u]
+        in_tot[c] += k_in[u]
+
+    def gain(u, c, link):
+        return link / m - gamma * (k_out[u] * in_tot[c] + k_in[u] * out_tot[c]) / m ** 2
+
+    queue = deque(nodes)
+    queued = set(queue)
+    moves = 0
+    evaluations = 0
+    while queue and evaluations < max_evaluations:
+        u = queue.popleft()
+        queued.discard(u)
+        evaluations += 1
+
+        c_old = partition[u]
+        links = defaultdict(float)
+        for v, w in out_adj[u].items():
+            links[partition[v]] += w
+        for v, w in in_adj[u].items():
+            links[partition[v]] += w
+
+        # remove u da sua comunidade
+        out_tot[c_old] -= k_out[u]
+        in_tot[c_old] -= k_in[u]
+
+        best, best_gain = c_old, gain(u, c_old, links.get(c_old, 0))
+        for c, link in links.items():
+            g = gain(u, c, link)
+            if g > best_gain + 1e-12:
+                best, best_gain = c, g
+        if best_gain < -1e-12:
+            best = new_label()
+
+        partition[u] = best
+        out_tot[best] += k_out[u]
+        in_tot[best] += k_in[u]
+        if best != c_old:
+            moves += 1
+            for v in list(out_adj[u]) + list(in_adj[u]):
+                if v not in queued and partition[v] != best:
+                    queue.append(v)
+                    queued.add(v)
+    return moves
+
+
+def _aggregate(partition, out_adj, loops):
+    """Agrega cada comunidade num super-nó (arcos internos viram laços)."""
+    agg_out = defaultdict(lambda: defaultdict(float))
+    agg_in = defaultdict(lambda: defaultdict(float))
+    agg_loops = defaultdict(float)
+    for u, c in partition.items():
+        agg_loops[c] += loops[u]
+        # cria os super-nós mesmo sem arcos para outras comunidades
+        agg_out[c]
+        agg_in[c]
+        for v, w in out_adj[u].items():
+            d = partition[v]
+            if d == c:
+                agg_loops[c] += w
+            else:
+                agg_out[c][d] += w
+                agg_in[d][c] += w
+    return agg_out, agg_in, agg_loops
+
+
+class CommunityTracker:
+    """
+    Acompanha as comunidades de uma sequência de grafos de intervalo do mesmo time.
+
+    O primeiro grafo é particionado com `greedy_modularity_communities`. Os seguintes partem
+    da partição do intervalo anterior: só os nós cujas arestas mudaram (adicionadas, removidas
+    ou com outro peso) e os nós novos saem das suas comunidades e são reavaliados por
+    movimentos locais de ganho de modularidade; os vizinhos de um nó que muda de comunidade
+    entram na fila. Em seguida as comunidades são agregadas em super-nós e fundidas quando
+    isso aumenta a modularidade. Os rótulos das comunidades são mantidos entre intervalos
+    (cada comunidade herda o rótulo anterior que mais sobrepõe), formando uma série temporal.
+
+    A partição é um ótimo local a partir da anterior: ela não é recalculada do zero e pode
+    ficar abaixo da partição gulosa de cada grafo isolado. Com refresh_every > 0 a partição
+    gulosa é recalculada a cada refresh_every intervalos.
+
+    :param weight: Atributo de aresta usado como peso (None para grafo não ponderado). O padrão
+                   'weight' é o mesmo de `calculate_modularity`.
+    :param resolution: Parâmetro de resolução da modularidade.
+    :param max_iter: Limite de avaliações de nós por intervalo, em múltiplos do número de nós.
+    :param refresh_every: Intervalos entre recálculos da partição gulosa (0 nunca recalcula).
+    """
+
+    def __init__(self, weight='weight', resolution=1, max_iter=10, refresh_every=0):
+        self.weight = weight
+        self.resolution = resolution
+        self.max_iter = max_iter
+        self.refresh_every = refresh_every
+        self.partition = {}
+        self.modularity = 0.0
+        self.history = []
+        self.moves = 0
+        self._adjacency = None
+        self._next_label = 0
+
+    def _new_label(self):
+        label = self._next_label
+        self._next_label += 1
+        return label
+
+    def _greedy(self, G):
+        """Partição gulosa, com os rótulos anteriores das comunidades que ela mais sobrepõe."""
+        partition = {}
+        for community in greedy_modularity_communities(G, weight=self.weight, resolution=self.resolution):
+            label = self._new_label()
+            for node in community:
+                partition[node] = label
+        return self._relabel(partition)
+
+    def _relabel(self, partition):
+        """Dá a cada comunidade o rótulo anterior que ela mais sobrepõe (rótulos novos só para as demais)."""
+        communities = defaultdict(list)
+        for node, label in partition.items():
+            communities[label].append(node)
+        relabeled = {}
+        used = set()
+        for label, nodes in sorted(communities.items(), key=lambda item: -len(item[1])):
+            previous = [self.partition[node] for node in nodes if node in self.partition]
+            labels = sorted(set(previous) - used, key=lambda c: (-previous.count(c), c))
+            new = labels[0] if labels else label
+            used.add(new)
+            for node in nodes:
+                relabeled[node] = new
+        return relabeled
+
+    def _weights(self, G):
+        """Arcos ponderados de saída e de entrada (sem laços) e peso dos laços de cada nó."""
+        def w(data):
+            return data.get(self.weight, 1) if self.weight is not None else 1
+
+        directed = G.is_directed()
+        # Grafos não direcionados são tratados como direcionados com arcos nos dois
+        # sentidos, de forma que m vale 2 * (soma dos pesos das arestas).
+        out_adj = {u: {v: w(d) for v, d in (G.succ if directed else G.adj)[u].items() if v != u} for u in G.nodes}
+        in_adj = out_adj if not directed else {u: {v: w(d) for v, d in G.pred[u].items() if v != u} for u in G.nodes}
+        loops = {u: (w(G.adj[u][u]) if directed else 2 * w(G.adj[u][u])) if G.has_edge(u, u) else 0
+                 for u in G.nodes}
+        return out_adj, in_adj, loops
+
+    def _touched(self, out_adj, in_adj, loops):
+        """Nós novos ou com alguma aresta diferente da do intervalo anterior."""
+        prev_out, prev_in, prev_loops = self._adjacency
+        return [
+            u for u in out_adj
+            if u not in prev_out or out_adj[u] != prev_out[u] or in_adj[u] != prev_in[u] or loops[u] != prev_loops[u]
+        ]
+
+    def _merge(self, partition, out_adj, in_adj, loops, m):
+        """Funde comunidades (super-nós do grafo agregado) enquanto a modularidade aumenta."""
+        while True:
+            agg_out, agg_in, agg_loops = _aggregate(partition, out_adj, loops)
+            k_out = {c: sum(agg_out[c].values()) + agg_loops[c] for c in agg_out}
+            k_in = {c: sum(agg_in[c].values()) + agg_loops[c] for c in agg_out}
+            level = {c: c for c in agg_out}
+            moves = _move_nodes(level, list(level), agg_out, agg_in, k_out, k_in, m, self.resolution,
+                                self.max_iter * len(level), self._new_label)
+            if not moves:
+                return partition
+            partition = {u: level[c] for u, c in partition.items()}
+
+    def _quality(self, partition, out_adj, k_out, k_in, loops, m):
+        internal = defaultdict(float)
+        out_tot = defaultdict(float)
+        in_tot = defaultdict(float)
+        for u, c in partition.items():
+            out_tot[c] += k_out[u]
+            in_tot[c] += k_in[u]
+            internal[c] += loops[u]
+            for v, w in out_adj[u].items():
+                if partition[v] == c:
+                    internal[c] += w
+        return sum(
+            internal[c] / m - self.resolution * out_tot[c] * in_tot[c] / m ** 2 for c in out_tot
+        )
+
+    def update(self, G, interval_id=None):
+        """
+        Atualiza a partição com o próximo grafo da sequência.
+
+        :param G: Grafo do intervalo (nx.Graph ou nx.DiGraph).
+        :param interval_id: Identificador do intervalo (padrão: G.graph['interval_id'] ou a posição).
+        :return: Modularidade da partição encontrada.
+        """
+        if interval_id is None:
+            interval_id = G.graph.get('interval_id', len(self.history))
+
+        out_adj, in_adj, loops = self._weights(G)
+        k_out = {u: sum(out_adj[u].values()) + loops[u] for u in G.nodes}
+        k_in = {u: sum(in_adj[u].values()) + loops[u] for u in G.nodes}
+        m = sum(k_out.values())
+
+        refresh = self.refresh_every and len(self.history) % self.refresh_every == 0
+        if self._adjacency is None or refresh:
+            partition = self._greedy(G) if m > 0 else {u: self._new_label() for u in G.nodes}
+            touched = []
+        else:
+            partition = {
+                u: self.partition[u] if u in self.partition else self._new_label() for u in G.nodes
+            }
+            touched = self._touched(out_adj, in_adj, loops)
+        self._adjacency = (out_adj, in_adj, loops)
+
+        if m == 0:
+            self.partition = partition
+            self.modularity = 0.0
+            self._record(interval_id)
+            return self.modularity
+
+        if touched:
+            # os nós tocados saem das suas comunidades, que assim também podem ser divididas
+            for u in touched:
+                partition[u] = self._new_label()
+            self.moves += _move_nodes(partition, touched, out_adj, in_adj, k_out, k_in, m, self.resolution,
+                                      self.max_iter * len(partition), self._new_label)
+            partition = self._relabel(self._merge(partition, out_adj, in_adj, loops, m))
+
+        self.partition = partition
+        self.modularity = self._quality(partition, out_adj, k_out, k_in, loops, m)
+        self._record(interval_id)
+        return self.modularity
+
+    def _record(self, interval_id):
+        self.history.append({
+            'interval_id': interval_id,
+            'modularity': self.modularity,
+            'partition': dict(self.partition)
+        })
+
+    def get_communities(self):
+        """Retorna a partição atual como lista de conjuntos de nós."""
+        communities = defaultdict(set)
+        for node, label in self.partition.items():
+            communities[label].add(node)
+        return list(communities.values())
+
+    def get_assignments(self):
+        """
+        Retorna as atribuições de comunidade de todos os intervalos processados.
+
+        :return: DataFrame com colunas [interval_id, node, community, modularity].
+        """
+        rows = [
+            {'interval_id': h['interval_id'], 'node': node, 'community': label, 'modularity': h['modularity']}
+            for h in self.history
+            for node, label in h['partition'].items()
+        ]
+        return pd.DataFrame(rows, columns=['interval_id', 'node', 'community', 'modularity'])
+
+
+def calculate_modularity_stream(graphs, weight='weight', resolution=1):
+    """
+    Calcula a modularidade de uma sequência de grafos de intervalo do mesmo time,
+    reaproveitando a partição do intervalo anterior (ver CommunityTracker).
+
+    :param graphs: Uma lista de grafos (nx.Graph ou nx.DiGraph) ordenada por intervalo.
+    :param weight: Atributo de aresta usado como peso ('weight', como em `calculate_modularity`).
+    :param resolution: Parâmetro de resolução da modularidade.
+    :return: Uma lista com a modularidade de cada grafo e o DataFrame de atribuições de comunidade.
+    """
+    tracker = CommunityTracker(weight=weight, resolution=resolution)
+    modularities = [tracker.update(G) for G in tqdm(graphs, desc='Calculando modularidade')]
+    return modularities, tracker.get_assignments()
+
+
 def calculate_graph_distance(G1,G2, method='sum'):
 
     if method == 'sum':
@@ -93,8 +377,11 @@ def calculate_graph_distance_stream(graphs, method='sum'):
     :return: Uma lista com as distâncias entre os grafos consecutivos.
     """
     distances = []
-    for i in tqdm(range(len(graphs)-1), desc=f'Calculando {method}'):
-        G1 = graphs[i]
-        G2 = graphs[i+1]
-        distances.append(calculate_graph_distance(G1, G2, method))
+    with stage('calculate_graph_distance_stream', method=method) as s:
+        for i in tqdm(range(len(graphs)-1), desc=f'Calculando {method}'):
+            G1 = graphs[i]
+            G2 = graphs[i+1]
+            distances.append(calculate_graph_distance(G1, G2, method))
+            s.count('pairs')
+        s.count('graphs', len(graphs))
     return distances
\ No newline at end of file
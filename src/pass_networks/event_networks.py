@@ -0,0 +1,426 @@
+import numpy as np
+import pandas as pd
+import networkx as nx
+
+from src.instrumentation import stage
+
+# Eventos que entram na rede de passes, por possession_type (saída de events_to_df).
+# O valor é None (todos os eventos do tipo), um dicionário {coluna: valores aceitos}
+# ou uma função (DataFrame) -> máscara booleana.
+NETWORK_EVENT_FILTERS = {
+    'PASS': {'outcome': ['C']},
+    'CARRY': lambda df: df['carry_type'].isin(['T', 'C']) | ((df['carry_type'] == 'D') & df['outcome'].isin(['K', 'B'])),
+    'SHOT': None,
+}
+
+# Nó que recebe as finalizações (receiver_id -1 em events_to_df)
+GOAL_SHIRT = -1
+GOAL_X = 52
+
+
+def filter_network_events(events_df, event_filters=None):
+    """
+    Seleciona os eventos usados na rede de passes.
+
+    :param events_df: DataFrame de events_to_df.
+    :param event_filters: Filtros por possession_type (padrão: NETWORK_EVENT_FILTERS).
+    :return: DataFrame com os eventos selecionados.
+    """
+    event_filters = NETWORK_EVENT_FILTERS if event_filters is None else event_filters
+
+    mask = np.zeros(len(events_df), dtype=bool)
+    for possession_type, event_filter in event_filters.items():
+        type_mask = (events_df['possession_type'] == possession_type).to_numpy()
+        if callable(event_filter):
+            type_mask = type_mask & np.asarray(event_filter(events_df), dtype=bool)
+        elif event_filter:
+            for column, values in event_filter.items():
+                type_mask = type_mask & events_df[column].isin(values).to_numpy()
+        mask |= type_mask
+    return events_df[mask]
+
+
+def match_seconds(metadata_df):
+    """
+    Segundos de jogo de cada frame, contados a partir do início da partida (o segundo tempo
+    continua após o fim do primeiro).
+
+    :param metadata_df: DataFrame com match_id, period e elapsed_seconds.
+    :return: Series alinhada com metadata_df.
+    """
+    first_half = metadata_df['elapsed_seconds'].where(metadata_df['period'] == 1)
+    max_seconds = first_half.groupby(metadata_df['match_id']).transform('max')
+    return metadata_df['elapsed_seconds'] + max_seconds * (metadata_df['period'] - 1)
+
+
+def assign_intervals(metadata_df, interval_seconds=120):
+    """
+    Calcula o interval_id de cada frame com intervalos de interval_seconds segundos de jogo.
+
+    :param metadata_df: DataFrame com match_id, frame_id, period e elapsed_seconds.
+    :return: Series interval_id alinhada com metadata_df.
+    """
+    return ((match_seconds(metadata_df) // interval_seconds) + 1).astype('int32')
+
+
+def _first_frame_values(events_df, metadata_df, values):
+    """Valor de `values` (alinhado com metadata_df) no primeiro frame de cada evento, NaN se ausente."""
+    keys = ['match_id', 'event_id', 'possession_id']
+    frames = metadata_df[keys + ['frame_id']].assign(value=values)
+    first = frames.sort_values('frame_id', kind='stable').drop_duplicates(keys)
+
+    index = pd.MultiIndex.from_frame(first[keys].astype(float))
+    rows = index.get_indexer(pd.MultiIndex.from_frame(events_df[keys].astype(float)))
+    return pd.api.extensions.take(first['value'].to_numpy(dtype=float), rows, allow_fill=True)
+
+
+def get_event_intervals(events_df, metadata_df, interval_seconds=120):
+    """
+    interval_id de cada evento, dado pelo primeiro frame do evento no metadata.
+
+    :return: Array float com o interval_id de cada linha de events_df (NaN se o evento
+             não aparece no metadata).
+    """
+    return _first_frame_values(events_df, metadata_df, assign_intervals(metadata_df, interval_seconds))
+
+
+def get_network_events(events_df, metadata_df, players_info, event_filters=None):
+    """
+    Eventos da rede de passes com o instante (segundos de jogo do primeiro frame) e as camisas
+    do passador e do receptor.
+
+    :param events_df: DataFrame de events_to_df.
+    :param metadata_df: Metadata dos frames (match_id, frame_id, period, elapsed_seconds,
+                        event_id, possession_id).
+    :param players_info: DataFrame com match_id, player_id e shirt_number.
+    :param event_filters: Filtros de eventos (ver filter_network_events).
+    :return: DataFrame com match_id, team_id, seconds, player_shirt e receiver_shirt, apenas dos
+             eventos com instante, time e camisas conhecidos.
+    """
+    events = filter_network_events(events_df, event_filters)
+    seconds = _first_frame_values(events, metadata_df, match_seconds(metadata_df))
+
+    shirt_of = players_info.drop_duplicates(['match_id', 'player_id'])
+    shirt_index = pd.MultiIndex.from_frame(shirt_of[['match_id', 'player_id']].astype(float))
+    shirt_numbers = shirt_of['shirt_number'].to_numpy(dtype=float)
+
+    def to_shirt(player_column):
+        rows = shirt_index.get_indexer(pd.MultiIndex.from_frame(events[['match_id', player_column]].astype(float)))
+        shirts = pd.api.extensions.take(shirt_numbers, rows, allow_fill=True)
+        return np.where(events[player_column].to_numpy(dtype=float) == GOAL_SHIRT, GOAL_SHIRT, shirts)
+
+    network_events = pd.DataFrame({
+        'match_id': events['match_id'].to_numpy(dtype=float),
+        'team_id': events['team_id'].to_numpy(dtype=float),
+        'seconds': seconds,
+        'player_shirt': to_shirt('player_id'),
+        'receiver_shirt': to_shirt('receiver_id'),
+    })
+    network_events = network_events.dropna()
+    return network_events.astype({'match_id': int, 'team_id': int, 'player_shirt': int, 'receiver_shirt': int})
+
+
+def get_interval_positions(players_df, interval_seconds=None, metadata_df=None, goal_node=True):
+    """
+    Posição média (x, y) de cada jogador em cada intervalo.
+
+    :param players_df: Saída de process_players (match_id, frame_id, team, team_id, player_id,
+                       shirt, x, y e interval_id).
+    :param interval_seconds: Se informado, recalcula o interval_id dos frames com esse tamanho de
+                             intervalo a partir de metadata_df.
+    :param goal_node: Adiciona o nó do gol (camisa -1) de cada time em cada intervalo.
+    :return: DataFrame com match_id, interval_id, team_id, player_id, shirt, x e y, no formato
+             de positions_df de get_interval_graphs.
+    """
+    if interval_seconds is not None:
+        intervals = metadata_df[['match_id', 'frame_id']].assign(
+            interval_id=assign_intervals(metadata_df, interval_seconds)
+        ).drop_duplicates(['match_id', 'frame_id'])
+        players_df = players_df.drop(columns='interval_id', errors='ignore').merge(
+            intervals, on=['match_id', 'frame_id'], how='left'
+        )
+
+    keys = ['match_id', 'interval_id', 'team_id', 'player_id', 'shirt']
+    positions_df = players_df.groupby(keys, observed=True, sort=False)[['x', 'y']].mean().reset_index()
+
+    if goal_node:
+        goals = players_df.groupby(['match_id', 'interval_id', 'team_id'], observed=True, sort=False)['team'].first().reset_index()
+        goals = goals.assign(
+            player_id=GOAL_SHIRT,
+            shirt=GOAL_SHIRT,
+            x=np.where(goals['team'] == 'home', GOAL_X, -GOAL_X),
+            y=0,
+        ).drop(columns='team')
+        positions_df = pd.concat([positions_df, goals[positions_df.columns]], ignore_index=True)
+
+    positions_df = positions_df.astype({'match_id': int, 'interval_id': int, 'team_id': int, 'player_id': int, 'shirt': int})
+    return positions_df.sort_values(['match_id', 'interval_id', 'team_id', 'player_id'], kind='stable').reset_index(drop=True)
+
+
+def get_pass_matrices(events_df, metadata_df, players_info, interval_seconds=120, event_filters=None):
+    """
+    Matrizes de contagem de passes por (match_id, interval_id, team_id), acumuladas numa única
+    passada com np.add.at.
+
+    :param events_df: DataFrame de events_to_df.
+    :param metadata_df: Metadata dos frames (match_id, frame_id, period, elapsed_seconds,
+                        event_id, possession_id).
+    :param players_info: DataFrame com match_id, player_id e shirt_number.
+    :param interval_seconds: Tamanho dos intervalos em segundos.
+    :param event_filters: Filtros de eventos (ver filter_network_events).
+    :return: (groups, shirts, counts): DataFrame com match_id, interval_id e team_id de cada
+             matriz, camisas que indexam linhas (passador) e colunas (receptor), e o array
+             (n_grupos, n_camisas, n_camisas) de contagens.
+    """
+    events = get_network_events(events_df, metadata_df, players_info, event_filters)
+    interval_id = (events['seconds'] // interval_seconds + 1).astype(int)
+
+    group_codes, groups = pd.MultiIndex.from_arrays(
+        [events['match_id'], interval_id, events['team_id']]
+    ).factorize(sort=True)
+    shirts, node_codes = np.unique(
+        np.concatenate([events['player_shirt'].to_numpy(), events['receiver_shirt'].to_numpy()]), return_inverse=True
+    )
+    passer, receiver = np.split(node_codes, 2)
+
+    counts = np.zeros((len(groups), len(shirts), len(shirts)), dtype=np.int32)
+    np.add.at(counts, (group_codes, passer, receiver), 1)
+
+    groups = pd.DataFrame(list(groups), columns=['match_id', 'interval_id', 'team_id']).astype(int)
+    return groups, shirts.astype(int), counts
+
+
+def matrices_to_passes(groups, shirts, counts):
+    """Converte as matrizes de get_pass_matrices em passes_df (formato de get_interval_graphs)."""
+    g, i, j = np.nonzero(counts)
+    passes_df = groups.iloc[g].reset_index(drop=True)
+    passes_df['player_shirt'] = shirts[i]
+    passes_df['receiver_shirt'] = shirts[j]
+    passes_df['count'] = counts[g, i, j]
+    return passes_df
+
+
+def get_event_interval_graphs(events_df, metadata_df, players_df, players_info, interval_seconds=120,
+                              event_filters=None, goal_node=True):
+    """
+    Constrói as redes de passes por intervalo diretamente dos eventos e do tracking.
+
+    Os eventos selecionados por event_filters são atribuídos ao intervalo do seu primeiro frame e
+    contados em matrizes (passador x receptor) por time e intervalo; os nós recebem a posição
+    média do jogador no intervalo. Cada evento conta uma vez.
+
+    :param events_df: DataFrame de events_to_df (uma ou mais partidas).
+    :param metadata_df: Metadata dos frames (match_id, frame_id, period, elapsed_seconds,
+                        event_id, possession_id).
+    :param players_df: Saída de process_players.
+    :param players_info: DataFrame com match_id, player_id e shirt_number.
+    :param interval_seconds: Tamanho dos intervalos em segundos.
+    :param event_filters: Filtros por possession_type (padrão: NETWORK_EVENT_FILTERS).
+    :param goal_node: Inclui o nó do gol, que recebe as finalizações.
+    :return: Lista de dicionários {match_id, interval_id, team_id, graph}, a mesma que
+             get_interval_graphs produz e save_graphs grava.
+    """
+    with stage('get_event_interval_graphs', interval_seconds=interval_seconds) as s:
+        s.count('event_rows', len(events_df))
+        s.count('player_rows', len(players_df))
+
+        groups, shirts, counts = get_pass_matrices(events_df, metadata_df, players_info, interval_seconds, event_filters)
+        positions_df = get_interval_positions(players_df, interval_seconds, metadata_df, goal_node)
+
+        group_row = {tuple(key): row for row, key in enumerate(groups.itertuples(index=False, name=None))}
+
+        graph_list = []
+        for (match_id, interval_id, team_id), nodes in positions_df.groupby(['match_id', 'interval_id', 'team_id'], sort=False):
+            G = nx.DiGraph(name=f"{interval_id}_team_{team_id}")
+            for shirt, x, y in zip(nodes['shirt'], nodes['x'], nodes['y']):
+                G.add_node(shirt, pos=(x, y), features=(x, y))
+
+            row = group_row.get((match_id, interval_id, team_id))
+            if row is not None:
+                i, j = np.nonzero(counts[row])
+                G.add_edges_from(
+                    (int(shirts[a]), int(shirts[b]), {'weight': int(counts[row, a, b])}) for a, b in zip(i, j)
+                )
+
+            graph_list.append({
+                'match_id': match_id,
+                'interval_id': interval_id,
+                'team_id': team_id,
+                'graph': G
+            })
+            s.count('graphs')
+            s.count('edges', G.number_of_edges())
+
+    return graph_list
+
+
+class PassWindows:
+    """
+    Redes de passes em janelas de qualquer tamanho e passo a partir de somas prefixadas.
+
+    Na construção, os eventos da rede e as posições dos jogadores de cada partida e time são
+    acumulados uma única vez em bins de `resolution` segundos de jogo e convertidos em somas
+    prefixadas: contagens de passes (bins + 1, n, n), soma das posições (bins + 1, n, 2) e número
+    de frames (bins + 1, n). A rede de uma janela [início, fim) é a diferença das somas nas duas
+    bordas, de modo que varrer tamanhos de janela e passos (tumbling ou deslizantes) não exige
+    reprocessar eventos nem tracking.
+
+    :param events_df: DataFrame de events_to_df.
+    :param metadata_df: Metadata dos frames (match_id, frame_id, period, elapsed_seconds,
+                        event_id, possession_id).
+    :param players_df: Saída de process_players.
+    :param players_info: DataFrame com match_id, player_id e shirt_number.
+    :param resolution: Tamanho do bin em segundos; janelas e passos são múltiplos dele.
+    :param event_filters: Filtros por possession_type (padrão: NETWORK_EVENT_FILTERS).
+    :param goal_node: Inclui o nó do gol, que recebe as finalizações.
+    """
+
+    def __init__(self, events_df, metadata_df, players_df, players_info, resolution=1, event_filters=None,
+                 goal_node=True):
+        self.resolution = resolution
+        self.goal_node = goal_node
+        self.teams = {}
+
+        with stage('pass_windows.build', resolution=resolution) as s:
+            events = get_network_events(events_df, metadata_df, players_info, event_filters)
+            events['bin'] = (events['seconds'] // resolution).astype(int)
+
+            frames = metadata_df[['match_id', 'frame_id']].assign(
+                bin=(match_seconds(metadata_df) // resolution).astype(int)
+            ).drop_duplicates(['match_id', 'frame_id'])
+            players = players_df[['match_id', 'frame_id', 'team', 'team_id', 'player_id', 'shirt', 'x', 'y']].merge(
+                frames, on=['match_id', 'frame_id'], how='inner'
+            ).dropna(subset=['team_id', 'player_id', 'shirt'])
+
+            self.n_bins = {
+                match_id: int(bins.max()) + 1 for match_id, bins in frames.groupby('match_id')['bin']
+            }
+            match_events = dict(list(events.groupby(['match_id', 'team_id'])))
+            for (match_id, team_id), team_players in players.groupby(['match_id', 'team_id'], observed=True):
+                team_events = match_events.get((match_id, team_id), events.iloc[:0])
+                self.teams[(int(match_id), int(team_id))] = self._accumulate(
+                    team_events, team_players, self.n_bins[match_id]
+                )
+                s.count('teams')
+            s.count('events', len(events))
+            s.count('player_rows', len(players))
+
+    def _accumulate(self, events, players, n_bins):
+        """Somas prefixadas de um time numa partida."""
+        nodes = players.groupby('shirt', observed=True)['player_id'].min()
+        if self.goal_node:
+            nodes[GOAL_SHIRT] = GOAL_SHIRT
+        extra = np.setdiff1d(np.concatenate([events['player_shirt'], events['receiver_shirt']]), nodes.index)
+        # nós na ordem de player_id (como em get_interval_positions); camisas sem tracking no fim
+        shirts = np.concatenate([nodes.sort_values(kind='stable').index.to_numpy(dtype=int), extra]).astype(int)
+        slot = pd.Index(shirts)
+        n = len(shirts)
+
+        counts = np.zeros((n_bins + 1, n, n), dtype=np.int32)
+        np.add.at(counts, (events['bin'].to_numpy() + 1,
+                           slot.get_indexer(events['player_shirt']),
+                           slot.get_indexer(events['receiver_shirt'])), 1)
+
+        player_slot = slot.get_indexer(players['shirt'].astype(int))
+        player_bin = players['bin'].to_numpy() + 1
+        position_sum = np.zeros((n_bins + 1, n, 2))
+        np.add.at(position_sum, (player_bin, player_slot), players[['x', 'y']].to_numpy(dtype=float))
+        frames = np.zeros((n_bins + 1, n), dtype=np.int64)
+        np.add.at(frames, (player_bin, player_slot), 1)
+
+        home = (players['team'] == 'home').any()
+        return {
+            'shirts': shirts,
+            'n_players': len(nodes) - int(self.goal_node),
+            'goal_x': GOAL_X if home else -GOAL_X,
+            'counts': np.cumsum(counts, axis=0),
+            'position_sum': np.cumsum(position_sum, axis=0),
+            'frames': np.cumsum(frames, axis=0),
+        }
+
+    def windows(self, match_id, length=120, stride=None):
+        """
+        Janelas [início, fim) em bins de uma partida. stride=None (ou igual a length) gera janelas
+        tumbling; stride menor que length gera janelas sobrepostas. A última janela pode ser parcial.
+        """
+        length_bins = int(round(length / self.resolution))
+        stride_bins = length_bins if stride is None else int(round(stride / self.resolution))
+        if length_bins < 1 or stride_bins < 1:
+            raise ValueError("length e stride devem ser maiores ou iguais a resolution.")
+        n_bins = self.n_bins[match_id]
+        starts = np.arange(0, n_bins, stride_bins)
+        return starts, np.minimum(starts + length_bins, n_bins)
+
+    def get_counts(self, match_id, team_id, start, end):
+        """
+        Matriz de contagens (passador x receptor) de um time entre start e end segundos.
+
+        :return: (camisas que indexam linhas e colunas, matriz de contagens)
+        """
+        team = self.teams[(match_id, team_id)]
+        a, b = int(start // self.resolution), int(end // self.resolution)
+        return team['shirts'], team['counts'][b] - team['counts'][a]
+
+    def get_graphs(self, length=120, stride=None, match_ids=None):
+        """
+        Redes de passes de todas as janelas de tamanho `length` e passo `stride` (em segundos).
+
+        :param match_ids: Partidas incluídas (padrão: todas).
+        :return: Lista de dicionários {match_id, interval_id, team_id, graph, start, end} no formato
+                 de get_interval_graphs (interval_id é o índice da janela, a partir de 1; start e
+                 end em segundos de jogo). Com stride=None e resolution dividindo length, as redes
+                 são as de get_event_interval_graphs(interval_seconds=length).
+        """
+        match_ids = sorted(self.n_bins) if match_ids is None else match_ids
+
+        graph_list = []
+        with stage('pass_windows.get_graphs', length=length, stride=stride) as s:
+            for match_id in match_ids:
+                starts, ends = self.windows(match_id, length, stride)
+                team_ids = sorted(team_id for m, team_id in self.teams if m == match_id)
+
+                # diferenças das somas prefixadas de todas as janelas de uma vez
+                windows = {}
+                for team_id in team_ids:
+                    team = self.teams[(match_id, team_id)]
+                    frames = team['frames'][ends] - team['frames'][starts]
+                    with np.errstate(invalid='ignore', divide='ignore'):
+                        positions = (team['position_sum'][ends] - team['position_sum'][starts]) / frames[..., None]
+                    windows[team_id] = (team, team['counts'][ends] - team['counts'][starts], frames, positions)
+
+                for w, (start, end) in enumerate(zip(starts, ends)):
+                    interval_id = w + 1
+                    for team_id in team_ids:
+                        team, counts, frames, positions = windows[team_id]
+                        present = frames[w] > 0
+                        if not present[:team['n_players'] + int(self.goal_node)].any():
+                            continue
+
+                        G = nx.DiGraph(name=f"{interval_id}_team_{team_id}")
+                        for k, shirt in enumerate(team['shirts']):
+                            if shirt == GOAL_SHIRT and self.goal_node:
+                                x, y = team['goal_x'], 0
+                            elif present[k]:
+                                x, y = positions[w, k]
+                            else:
+                                continue
+                            G.add_node(int(shirt), pos=(x, y), features=(x, y))
+
+                        i, j = np.nonzero(counts[w])
+                        G.add_edges_from(
+                            (int(team['shirts'][a]), int(team['shirts'][b]), {'weight': int(counts[w, a, b])})
+                            for a, b in zip(i, j)
+                        )
+
+                        graph_list.append({
+                            'match_id': match_id,
+                            'interval_id': interval_id,
+                            'team_id': team_id,
+                            'graph': G,
+                            'start': start * self.resolution,
+                            'end': end * self.resolution,
+                        })
+                        s.count('graphs')
+                        s.count('edges', G.number_of_edges())
+
+        return graph_list
@@ -0,0 +1,165 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+from collections import OrderedDict
+from functools import partial
+
+
+def _attributes(data):
+    return tuple(sorted((repr(k), repr(v)) for k, v in data.items()))
+
+
+def graph_fingerprint(graph):
+    """
+    Calcula um hash estável para um grafo.
+
+    O hash usa a lista canônica (ordenada) de nós e arestas com todos os seus atributos
+    (pesos, distâncias, posições...), de modo que grafos com a mesma topologia e atributos
+    diferentes, como frames consecutivos, têm hashes diferentes. Atributos do grafo
+    (nome, interval_id) não entram no hash.
+
+    :param graph: Um objeto NetworkX (DiGraph ou Graph).
+    :return: String hexadecimal com o hash.
+    """
+    nodes = sorted((repr(n), _attributes(d)) for n, d in graph.nodes(data=True))
+    edges = sorted(
+        ((repr(u), repr(v)) if graph.is_directed() else tuple(sorted((repr(u), repr(v)))))
+        + (_attributes(d),)
+        for u, v, d in graph.edges(data=True)
+    )
+    payload = repr((graph.is_directed(), graph.is_multigraph(), nodes, edges)).encode()
+    return hashlib.sha1(payload).hexdigest()
+
+
+def _qualified_name(function):
+    function = getattr(function, '__wrapped__', function)
+    name = f"{getattr(function, '__module__', '')}.{getattr(function, '__qualname__', type(function).__name__)}"
+    code = getattr(function, '__code__', None)
+    if code is not None and ('<lambda>' in name or '<locals>' in name):
+        # lambdas e funções locais não têm nome único: o código os distingue
+        body = (code.co_code, code.co_names, code.co_varnames,
+                tuple(c for c in code.co_consts if not hasattr(c, 'co_code')))
+        name += '#' + hashlib.sha1(repr(body).encode()).hexdigest()[:12]
+    return name
+
+
+def _stable_repr(value):
+    """repr dos parâmetros, com funções pelo nome qualificado (sem endereços de memória)."""
+    if callable(value):
+        return _qualified_name(value)
+    if isinstance(value, (list, tuple)):
+        return '(' + ', '.join(_stable_repr(v) for v in value) + ')'
+    if isinstance(value, dict):
+        return '{' + ', '.join(f'{k!r}: {_stable_repr(v)}' for k, v in sorted(value.items())) + '}'
+    return repr(value)
+
+
+def metric_params(metric_function, version=None):
+    """
+    Representação estável da função de uma métrica e dos seus parâmetros, igual entre processos:
+    nome qualificado da função, argumentos fixados por functools.partial e uma versão opcional
+    (para invalidar resultados quando a implementação da métrica muda).
+    """
+    args, kwargs = (), {}
+    if isinstance(metric_function, partial):
+        args = metric_function.args
+        kwargs = metric_function.keywords
+        metric_function = metric_function.func
+    return '|'.join([_qualified_name(metric_function), _stable_repr(args), _stable_repr(kwargs), str(version or '')])
+
+
+class MetricsCache:
+    """
+    Cache de resultados de métricas indexado pelo hash do grafo, nome da métrica e parâmetros.
+
+    Mantém os resultados mais recentes em memória com descarte LRU e, opcionalmente,
+    persiste todos os resultados num arquivo SQLite para reaproveitá-los entre sessões.
+
+    :param path: Caminho do arquivo SQLite (None para cache apenas em memória).
+    :param maxsize: Número máximo de resultados mantidos em memória.
+    :param version: Versão incluída na chave de todas as métricas (ver `metric_params`).
+    """
+
+    def __init__(self, path=None, maxsize=100000, version=None):
+        self.path = path
+        self.maxsize = maxsize
+        self.version = version
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.conn = None
+
+        if path:
+            folder = os.path.dirname(path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self.conn = sqlite3.connect(path)
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS metrics ("
+                "fingerprint TEXT, metric TEXT, params TEXT, value BLOB, "
+                "PRIMARY KEY (fingerprint, metric, params))"
+            )
+            self.conn.commit()
+
+    def __len__(self):
+        return len(self.memory)
+
+    def fingerprint(self, graph):
+        return graph_fingerprint(graph)
+
+    def _remember(self, key, value):
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
+
+    def get(self, fingerprint, metric_name, params=''):
+        """Retorna (True, valor) se o resultado estiver no cache, senão (False, None)."""
+        key = (fingerprint, metric_name, params)
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return True, self.memory[key]
+
+        if self.conn is not None:
+            row = self.conn.execute(
+                "SELECT value FROM metrics WHERE fingerprint = ? AND metric = ? AND params = ?",
+                key,
+            ).fetchone()
+            if row is not None:
+                value = pickle.loads(row[0])
+                self._remember(key, value)
+                self.hits += 1
+                return True, value
+
+        self.misses += 1
+        return False, None
+
+    def set(self, fingerprint, metric_name, value, params='', commit=True):
+        key = (fingerprint, metric_name, params)
+        self._remember(key, value)
+        if self.conn is not None:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO metrics (fingerprint, metric, params, value) VALUES (?, ?, ?, ?)",
+                key + (pickle.dumps(value),),
+            )
+            if commit:
+                self.conn.commit()
+
+    def commit(self):
+        if self.conn is not None:
+            self.conn.commit()
+
+    def clear(self):
+        """Limpa o cache em memória e em disco."""
+        self.memory.clear()
+        if self.conn is not None:
+            self.conn.execute("DELETE FROM metrics")
+            self.conn.commit()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
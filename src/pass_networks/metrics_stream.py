@@ -0,0 +1,113 @@
+from collections import defaultdict
+
+import networkx as nx
+
+from src.rolling import RollingStatistics
+
+
+class MetricsStream:
+    """
+    Operador de métricas em fluxo sobre uma sequência de grafos.
+
+    Consome um gerador de grafos (por exemplo, `GraphStream.get_graph_stream()`, que
+    produz tuplas (G, interval_id), ou a lista de dicionários de `get_interval_graphs`),
+    calcula as métricas registradas para cada grafo e mantém estatísticas móveis por
+    métrica sem materializar DataFrames intermediários. Detectores de drift com a
+    interface do river (`update` e `drift_detected`) podem ser associados às métricas.
+
+    :param metrics: Dicionário {nome: função(grafo)} com as métricas a calcular.
+    :param window: Tamanho da janela das estatísticas móveis.
+    :param ewma_alpha: Fator de suavização da EWMA.
+    :param group_by: Chaves dos dicionários de entrada que separam as séries
+                     (padrão: ('match_id', 'team_id')).
+    """
+
+    def __init__(self, metrics=None, window=4, ewma_alpha=0.5, group_by=('match_id', 'team_id')):
+        self.metrics = dict(metrics or {})
+        self.window = window
+        self.ewma_alpha = ewma_alpha
+        self.group_by = group_by
+        self.detector_factories = {}
+        self.statistics = defaultdict(dict)
+        self.detectors = defaultdict(dict)
+        self.positions = defaultdict(int)
+
+    def register(self, metric_name, metric_function):
+        """Registra uma nova métrica."""
+        self.metrics[metric_name] = metric_function
+        return self
+
+    def add_detector(self, metric_name, detector_factory, source='value'):
+        """
+        Associa um detector de drift a uma métrica.
+
+        :param metric_name: Nome da métrica monitorada.
+        :param detector_factory: Função sem argumentos que cria o detector (ex.: lambda: drift.KSWIN()).
+                                 Um detector é criado para cada série (grupo).
+        :param source: Valor enviado ao detector: 'value', 'mean' ou 'ewma'.
+        """
+        self.detector_factories[metric_name] = (detector_factory, source)
+        return self
+
+    def _unpack(self, item):
+        """Extrai (grupo, interval_id, grafo) dos formatos de entrada suportados."""
+        if isinstance(item, dict):
+            key = tuple(item.get(k) for k in self.group_by)
+            return key, item.get('interval_id'), item['graph']
+        if isinstance(item, tuple):
+            G, interval_id = item[0], item[1]
+            return None, interval_id, G
+        if isinstance(item, nx.Graph):
+            return None, item.graph.get('interval_id'), item
+        raise TypeError(f"Formato de entrada não suportado: {type(item)}")
+
+    def update(self, item):
+        """
+        Processa um único grafo e retorna o registro com as métricas e estatísticas.
+
+        :param item: nx.Graph, tupla (G, interval_id) ou dicionário com a chave 'graph'.
+        :return: Dicionário com interval_id, valores das métricas, suas estatísticas
+                 móveis (<métrica>_mean, <métrica>_var, <métrica>_ewma) e, para métricas
+                 monitoradas, <métrica>_drift.
+        """
+        key, interval_id, G = self._unpack(item)
+
+        position = self.positions[key]
+        self.positions[key] += 1
+
+        record = {'interval_id': interval_id if interval_id is not None else position}
+        if key is not None:
+            record.update(dict(zip(self.group_by, key)))
+
+        stats = self.statistics[key]
+        for metric_name, metric_function in self.metrics.items():
+            value = metric_function(G)
+
+            if metric_name not in stats:
+                stats[metric_name] = RollingStatistics(self.window, self.ewma_alpha)
+            rolling = stats[metric_name].update(value)
+
+            record[metric_name] = value
+            record[f'{metric_name}_mean'] = rolling.mean
+            record[f'{metric_name}_var'] = rolling.var
+            record[f'{metric_name}_ewma'] = rolling.ewma
+
+            if metric_name in self.detector_factories:
+                factory, source = self.detector_factories[metric_name]
+                detectors = self.detectors[key]
+                if metric_name not in detectors:
+                    detectors[metric_name] = factory()
+                detector = detectors[metric_name]
+                detector.update(value if source == 'value' else getattr(rolling, source))
+                record[f'{metric_name}_drift'] = bool(detector.drift_detected)
+
+        return record
+
+    def process(self, graphs):
+        """
+        Gerador que consome os grafos um a um e produz um registro por grafo.
+
+        :param graphs: Iterável de grafos (ver `update` para os formatos aceitos).
+        """
+        for item in graphs:
+            yield self.update(item)
@@ -2,6 +2,7 @@ import numpy as np
 import networkx as nx
 
 from .custom_metrics import calculate_simrank, calculate_wasserstein_distance
+from .metrics_cache import metric_params
 
 def create_team_graphs(passes_df, positions_df, interval_id):
     """
@@ -75,16 +76,34 @@ def create_team_graphs(passes_df, positions_df, interval_id):
         
     return graphs_dict
 
-def calculate_metrics(graph, metrics):
+def calculate_metrics(graph, metrics, cache=None):
     """
     Calcula métricas especificadas para um grafo.
     
     :param graph: O grafo a ser analisado (nx.Graph ou nx.DiGraph).
     :param metrics: Um dicionário onde as chaves são os nomes das métricas
                     e os valores são funções que calculam essas métricas.
+    :param cache: MetricsCache opcional. Se informado, apenas as métricas ausentes
+                  no cache são calculadas e os novos resultados são armazenados.
     :return: Um dicionário com os valores das métricas calculadas.
     """
     results = {}
+    if cache is None:
+        for metric_name, metric_function in metrics.items():
+            results[metric_name] = metric_function(graph)
+        return results
+
+    fingerprint = cache.fingerprint(graph)
+    computed = False
     for metric_name, metric_function in metrics.items():
-        results[metric_name] = metric_function(graph)
+        params = metric_params(metric_function, cache.version)
+        found, value = cache.get(fingerprint, metric_name, params)
+        if not found:
+            value = metric_function(graph)
+            cache.set(fingerprint, metric_name, value, params, commit=False)
+            computed = True
+        results[metric_name] = value
+
+    if computed:
+        cache.commit()
     return results
@@ -4,6 +4,8 @@ from dotenv import load_dotenv
 import os
 import numpy as np
 
+from .event_networks import filter_network_events, get_event_intervals
+
 load_dotenv()
 
 def events_to_df(events, match_id):
@@ -127,14 +129,21 @@ def get_match_events(match_id):
         return -1
     
 
-def get_grouped_events(possession_events_df):
+def get_grouped_events(possession_events_df, metadata_df=None, interval_seconds=120, event_filters=None):
+    """
+    Conta as interações (passes, conduções e finalizações) entre jogadores de cada time.
 
-    teams = possession_events_df['team_id'].unique()
-    
-    
-    home_df = possession_events_df[possession_events_df['team_id'] == teams[0]]
-    away_df = possession_events_df[possession_events_df['team_id'] == teams[1]]
+    :param possession_events_df: DataFrame de events_to_df.
+    :param metadata_df: Metadata dos frames; se informado, as contagens são separadas por intervalo.
+    :param interval_seconds: Tamanho dos intervalos em segundos.
+    :param event_filters: Filtros por possession_type (padrão: NETWORK_EVENT_FILTERS).
+    :return: DataFrame com match_id, [interval_id,] team_id, player_id, receiver_id e count.
+    """
+    events = filter_network_events(possession_events_df, event_filters)
 
-    home_pass_df = home_df.groupby(['player_id', 'receiver_id']).size().reset_index(name='count')
-    away_pass_df = away_df.groupby(['player_id', 'receiver_id']).size().reset_index(name='count')
+    keys = ['match_id', 'team_id', 'player_id', 'receiver_id']
+    if metadata_df is not None:
+        events = events.assign(interval_id=get_event_intervals(events, metadata_df, interval_seconds))
+        keys.insert(1, 'interval_id')
 
+    return events.groupby(keys).size().reset_index(name='count')
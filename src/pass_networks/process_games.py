@@ -6,6 +6,7 @@ import gandula
 from gandula.export.dataframe import pff_frames_to_dataframe
 from gandula.features.pff import add_ball_speed, add_players_speed
 from .process_events import get_match_events
+from src.data.schema import apply_schema, to_str, METADATA_SCHEMA, PLAYERS_SCHEMA
 
 def process_game(args):
 
@@ -22,6 +23,8 @@ def process_game(args):
             game_id,
         )
     )
+    metadata_df = apply_schema(metadata_df, METADATA_SCHEMA)
+    players_df = apply_schema(players_df, PLAYERS_SCHEMA)
 
     
 
@@ -37,9 +40,9 @@ def load_game(args):
 
         events_df = pd.read_csv(f"{path}/{game_id}/events.csv")
 
-        metadata_df = pd.read_parquet(f"{path}/{game_id}/metadata.parquet")
+        metadata_df = apply_schema(pd.read_parquet(f"{path}/{game_id}/metadata.parquet"), METADATA_SCHEMA)
         
-        players_df = pd.read_parquet(f"{path}/{game_id}/players.parquet")
+        players_df = apply_schema(pd.read_parquet(f"{path}/{game_id}/players.parquet"), PLAYERS_SCHEMA)
 
         return metadata_df, players_df, events_df
     
@@ -70,26 +73,18 @@ def save_game(metadata_df,players_df,events_df,path,game_id):
     players_df.to_parquet(f"{game_path}/players.parquet", engine="fastparquet")
     events_df.to_csv(f"{game_path}/events.csv")
 
-def process_metadata(metadata_df):
+def process_metadata(metadata_df, interval_seconds=120):
+    metadata_df = apply_schema(metadata_df, METADATA_SCHEMA)
+
     max_seconds = metadata_df.loc[metadata_df['period']==1,'elapsed_seconds'].max()
     metadata_df['seconds'] =  metadata_df['elapsed_seconds'] + (max_seconds * (metadata_df['period']-1))
 
-    metadata_df['interval_id'] =  (metadata_df['seconds']//120 )+ 1
-    metadata_df['interval_id'] = metadata_df['interval_id'].astype(int)
+    metadata_df['interval_id'] = ((metadata_df['seconds']//interval_seconds )+ 1).astype('int32')
 
-    metadata_df['event_setpiece_type'] = metadata_df['event_setpiece_type'].astype(str)
+    # the set piece type stays categorical, only its categories are converted to strings
+    metadata_df['event_setpiece_type'] = to_str(metadata_df['event_setpiece_type'])
 
     metadata_events_df = metadata_df[metadata_df['event_setpiece_type'].isin(['SetPieceType.KICK_OFF','SetPieceType.GOAL_KICK','nan', 'None'])]
 
-    metadata_events_df['frame_id'] = metadata_events_df['frame_id'].astype(int)
-    metadata_events_df['event_id'] = metadata_events_df['event_id'].astype(float)
-    metadata_events_df['event_start_frame'] = metadata_events_df['event_start_frame'].astype(float)
-    metadata_events_df['event_end_frame'] = metadata_events_df['event_end_frame'].astype(float)
-    metadata_events_df['possession_id'] = metadata_events_df['possession_id'].astype(float)
-    metadata_events_df['possession_start_frame'] = metadata_events_df['possession_start_frame'].astype(float)
-    metadata_events_df['possession_end_frame'] = metadata_events_df['possession_end_frame'].astype(float)
-    metadata_events_df['period'] = metadata_events_df['period'].astype(int)
-    metadata_events_df['match_id'] = metadata_events_df['match_id'].astype(int)
-
     return metadata_events_df
 
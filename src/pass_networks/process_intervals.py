@@ -2,6 +2,7 @@ import pandas as pd
 from tqdm.auto import tqdm
 from multiprocessing import Pool, cpu_count
 from .pass_network import create_team_graphs
+from src.instrumentation import stage
 import pickle
 
 def get_interval_graphs(passes_df, positions_df):
@@ -14,20 +15,26 @@ def get_interval_graphs(passes_df, positions_df):
     team_ids = positions_df['team_id'].unique()
     match_id = positions_df['match_id'][0]
 
-    for interval_id in tqdm(interval_ids, desc="Processing intervals", total=len(interval_ids)):
-        interval_passes_df = passes_df[passes_df['interval_id'] == interval_id].reset_index(drop=True)
-        interval_positions_df = positions_df[positions_df['interval_id'] == interval_id].reset_index(drop=True)
-        graphs = create_team_graphs(interval_passes_df, interval_positions_df, interval_id)
-
-        for team in team_ids:
-            
-            graph = graphs[str(team)]
-            graph_list.append({
-                'match_id': match_id,
-                'interval_id': interval_id,
-                'team_id': team,
-                'graph': graph
-            })
+    with stage("get_interval_graphs", match_id=match_id) as s:
+        s.count("pass_rows", len(passes_df))
+        s.count("position_rows", len(positions_df))
+
+        for interval_id in tqdm(interval_ids, desc="Processing intervals", total=len(interval_ids)):
+            interval_passes_df = passes_df[passes_df['interval_id'] == interval_id].reset_index(drop=True)
+            interval_positions_df = positions_df[positions_df['interval_id'] == interval_id].reset_index(drop=True)
+            graphs = create_team_graphs(interval_passes_df, interval_positions_df, interval_id)
+
+            for team in team_ids:
+                
+                graph = graphs[str(team)]
+                graph_list.append({
+                    'match_id': match_id,
+                    'interval_id': interval_id,
+                    'team_id': team,
+                    'graph': graph
+                })
+                s.count("graphs")
+                s.count("edges", graph.number_of_edges())
 
     return graph_list
 
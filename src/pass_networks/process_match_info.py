@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 
+from src.data.schema import apply_schema, METADATA_SCHEMA, PLAYERS_SCHEMA
+
 def get_match_info(path):
     players_info = pd.read_csv(path+'/players_matches.csv')
     teams_info = pd.read_csv(path+'/teams.csv')
@@ -8,32 +10,88 @@ def get_match_info(path):
 
     return players_info, teams_info, games_info
 
+def _lookup(keys, index):
+    """
+    Position in `index` (unique MultiIndex) of each row of `keys` (list of columns), -1 if absent.
+
+    Each key column is factorized and the codes are combined into one integer per row, so the
+    hash lookup in `index` runs once per distinct key (e.g. one per frame or per player)
+    instead of once per tracking row.
+    """
+    combined = np.zeros(len(keys[0]), dtype=np.int64)
+    missing = np.zeros(len(keys[0]), dtype=bool)
+    levels = []
+    for key in keys:
+        codes, uniques = pd.factorize(np.asarray(key))
+        combined = combined * len(uniques) + codes
+        missing |= codes < 0
+        levels.append(uniques)
+
+    rows, distinct = pd.factorize(np.where(missing, -1, combined))
+
+    # decode each distinct combined code back to its key values
+    unique_keys = []
+    remainder = distinct
+    for uniques in reversed(levels):
+        remainder, codes = np.divmod(remainder, len(uniques))
+        unique_keys.append(uniques[codes])
+    positions = index.get_indexer(pd.MultiIndex.from_arrays(unique_keys[::-1]))
+    positions[distinct < 0] = -1
+
+    return positions[rows]
+
+
+def _take(column, positions):
+    """Values of `column` at `positions`, NaN where the position is -1 (as in a left merge)."""
+    return pd.api.extensions.take(column.to_numpy(), positions, allow_fill=True)
+
+
 def process_players(players_df, match_info, players_info, metadata_events_df):
+    """
+    Adds team_id, interval_id and the player info to the tracking rows and mirrors the
+    coordinates of the period in which the home team attacks to the left.
 
-    players_df = players_df.merge(
-        match_info[['match_id', 'home_team_id', 'away_team_id']],
-        on='match_id',
-        how='left'
-    )
+    Same result as left merges with match_info, metadata_events_df (on match_id, frame_id) and
+    players_info (on match_id, team_id, shirt_number), done as one pass of index lookups over the
+    tracking rows. Duplicate keys in metadata_events_df and players_info keep their first row.
+    """
+    players_df = apply_schema(players_df, PLAYERS_SCHEMA)
+    metadata_events_df = apply_schema(metadata_events_df[['match_id','frame_id','interval_id']], METADATA_SCHEMA)
+
+    match_id = players_df['match_id']
+    columns = {}
 
     if match_info['home_team_start_left'][0]:
-        players_df.loc[players_df['period']==2,'x'] *= -1
-        players_df.loc[players_df['period']==2,'y'] *= -1
+        flip = (players_df['period'] == 2).to_numpy()
     else:
-        players_df.loc[players_df['period']==1,'x'] *= -1
-        players_df.loc[players_df['period']==1,'y'] *= -1
+        flip = (players_df['period'] == 1).to_numpy()
+    for axis in ('x', 'y'):
+        values = players_df[axis].to_numpy()
+        columns[axis] = np.where(flip, -values, values)
 
-    players_df['team_id'] = np.where(
-        players_df['team'] == 'home',
-        players_df['home_team_id'],
-        players_df['away_team_id']
+    teams = match_info.drop_duplicates('match_id').set_index('match_id')
+    match_row = teams.index.get_indexer(match_id)
+    columns['team_id'] = np.where(
+        (players_df['team'] == 'home').to_numpy(),
+        _take(teams['home_team_id'], match_row),
+        _take(teams['away_team_id'], match_row)
     )
-    players_df.drop(['home_team_id', 'away_team_id'], axis=1, inplace=True)
 
-    players_df['frame_id'] = players_df['frame_id'].astype(float)
-
-    players_df = players_df.merge(metadata_events_df[['match_id','frame_id','interval_id']], on=['match_id','frame_id'], how='left')
+    frames = metadata_events_df.drop_duplicates(['match_id','frame_id'])
+    frame_row = _lookup(
+        [match_id, players_df['frame_id']],
+        pd.MultiIndex.from_frame(frames[['match_id','frame_id']])
+    )
+    columns['interval_id'] = _take(frames['interval_id'], frame_row)
 
-    players_df = players_df.merge(players_info, left_on=['match_id','team_id','shirt'], right_on=['match_id','team_id','shirt_number'], how='left').drop_duplicates().reset_index(drop=True)
+    keys = ['match_id','team_id','shirt_number']
+    players_info = players_info.drop_duplicates(keys)
+    player_row = _lookup(
+        [match_id, columns['team_id'], players_df['shirt']],
+        pd.MultiIndex.from_frame(players_info[keys])
+    )
+    for column in players_info.columns:
+        if column not in ('match_id', 'team_id'):
+            columns[column] = _take(players_info[column], player_row)
 
-    return players_df
\ No newline at end of file
+    return players_df.assign(**columns).reset_index(drop=True)
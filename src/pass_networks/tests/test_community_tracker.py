@@ -0,0 +1,58 @@
+import networkx as nx
+import numpy as np
+from networkx.algorithms.community import greedy_modularity_communities, modularity
+
+from src.concept_drift.syntethic_graphs import generate_synthetic_graph_stream
+from src.pass_networks.custom_metrics import CommunityTracker, calculate_modularity_stream
+
+
+def _two_teams(w_between=1):
+    G = nx.DiGraph()
+    for group in ([0, 1, 2, 3], [4, 5, 6, 7]):
+        for u in group:
+            for v in group:
+                if u != v:
+                    G.add_edge(u, v, weight=5)
+    G.add_edge(3, 4, weight=w_between)
+    return G
+
+
+def test_modularity_is_weighted_like_calculate_modularity():
+    G = _two_teams()
+    tracker = CommunityTracker()
+    q = tracker.update(G)
+    # nx.modularity usa weight='weight', como calculate_modularity
+    assert np.isclose(q, modularity(G, tracker.get_communities()))
+    assert sorted(map(sorted, tracker.get_communities())) == [[0, 1, 2, 3], [4, 5, 6, 7]]
+
+
+def test_unchanged_graph_moves_no_node_and_keeps_labels():
+    tracker = CommunityTracker()
+    tracker.update(_two_teams())
+    partition = dict(tracker.partition)
+    tracker.update(_two_teams())
+    assert tracker.moves == 0
+    assert tracker.partition == partition
+
+    # uma aresta mais pesada só reavalia seus extremos; os rótulos continuam os mesmos
+    tracker.update(_two_teams(w_between=2))
+    assert tracker.partition == partition
+
+
+def test_stream_stays_close_to_greedy():
+    graph_list, _ = generate_synthetic_graph_stream(n_matches=2, n_intervals=30, seed=0)
+    streams = {}
+    for item in graph_list:
+        streams.setdefault((item['match_id'], item['team_id']), []).append(item['graph'])
+
+    diffs = []
+    for graphs in streams.values():
+        modularities, assignments = calculate_modularity_stream(graphs)
+        for G, q in zip(graphs, modularities):
+            greedy = modularity(G, greedy_modularity_communities(G, weight='weight'))
+            diffs.append(q - greedy)
+        assert set(assignments['interval_id']) == {G.graph.get('interval_id', i) for i, G in enumerate(graphs)}
+
+    diffs = np.array(diffs)
+    assert diffs.mean() > -0.01
+    assert diffs.min() > -0.1
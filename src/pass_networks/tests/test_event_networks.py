@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from src.concept_drift.syntethic_graphs import generate_synthetic_tracking
+from src.pass_networks.event_networks import (
+    assign_intervals, filter_network_events, get_event_interval_graphs, get_interval_positions
+)
+from src.pass_networks.process_intervals import get_interval_graphs
+from src.pass_networks.process_match_info import process_players
+
+
+def _match(seed=3, duration=1800):
+    metadata, players, _ = generate_synthetic_tracking(seed=seed, duration=duration)
+    match_info = pd.DataFrame({
+        'match_id': [1], 'home_team_id': [10], 'away_team_id': [20], 'home_team_start_left': [True]
+    })
+    players_info = pd.DataFrame({
+        'match_id': 1,
+        'team_id': np.repeat([10, 20], 11),
+        'shirt_number': np.tile(np.arange(1, 12), 2),
+        'player_id': np.arange(100, 122),
+    })
+    with_intervals = metadata.assign(interval_id=assign_intervals(metadata))
+    players_df = process_players(players, match_info, players_info, with_intervals)
+
+    rng = np.random.default_rng(seed)
+    ev = metadata.drop_duplicates('event_id')
+    n = len(ev)
+    team = np.where(ev['home_has_possession'], 10, 20)
+    first_player = np.where(team == 10, 100, 111)
+    events = pd.DataFrame({
+        'match_id': 1,
+        'team_id': team,
+        'event_id': ev['event_id'].values,
+        'possession_id': ev['possession_id'].values,
+        'possession_type': rng.choice(['PASS', 'CARRY', 'SHOT'], n, p=[.7, .25, .05]),
+        'player_id': first_player + rng.integers(0, 11, n),
+        'receiver_id': first_player + rng.integers(0, 11, n),
+        'outcome': rng.choice(['C', 'D', 'K', None], n),
+        'carry_type': rng.choice(['T', 'C', 'D', None], n),
+    })
+    events.loc[events['possession_type'] == 'SHOT', 'receiver_id'] = -1
+    return events, metadata, with_intervals, players_df, players_info
+
+
+def _notebook_graphs(events, with_intervals, players_df, players_info):
+    """Caminho do notebook: eventos no intervalo do primeiro frame, contagem e get_interval_graphs."""
+    keys = ['match_id', 'event_id', 'possession_id']
+    first_frames = with_intervals.sort_values('frame_id').drop_duplicates(keys)
+    network_events = filter_network_events(events).merge(
+        first_frames[keys + ['interval_id']], on=keys, how='left'
+    )
+    grouped = network_events.groupby(
+        ['match_id', 'interval_id', 'team_id', 'player_id', 'receiver_id']
+    ).size().reset_index(name='count')
+
+    shirts = players_info[['match_id', 'player_id', 'shirt_number']]
+    grouped = grouped.merge(shirts, how='left', on=['match_id', 'player_id'])
+    grouped = grouped.rename(columns={'shirt_number': 'player_shirt'})
+    grouped = grouped.merge(shirts.rename(columns={'player_id': 'receiver_id'}), how='left', on=['match_id', 'receiver_id'])
+    grouped = grouped.rename(columns={'shirt_number': 'receiver_shirt'})
+    grouped['receiver_shirt'] = grouped['receiver_shirt'].fillna(-1).astype(int)
+    return get_interval_graphs(grouped, get_interval_positions(players_df))
+
+
+def test_event_graphs_match_the_notebook_pipeline():
+    events, metadata, with_intervals, players_df, players_info = _match()
+    graphs = get_event_interval_graphs(events, metadata, players_df, players_info)
+    expected = _notebook_graphs(events, with_intervals, players_df, players_info)
+
+    assert len(graphs) == len(expected) > 0
+    for item, reference in zip(graphs, expected):
+        assert (item['match_id'], item['interval_id'], item['team_id']) == \
+               (reference['match_id'], reference['interval_id'], reference['team_id'])
+        G, R = item['graph'], reference['graph']
+        assert G.name == R.name
+        assert sorted(G.edges(data='weight')) == sorted(R.edges(data='weight'))
+        assert dict(G.nodes(data='pos')) == dict(R.nodes(data='pos'))
+    assert sum(item['graph'].size(weight='weight') for item in graphs) == len(filter_network_events(events))
@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from functools import partial
+
+import networkx as nx
+
+from src.pass_networks.metrics_cache import MetricsCache, graph_fingerprint, metric_params
+from src.pass_networks.pass_network import calculate_metrics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# roda num processo novo: calcula as métricas com o cache em disco e imprime hits/misses
+SESSION = textwrap.dedent('''
+    import json, sys
+    from functools import partial
+    import networkx as nx
+    from src.pass_networks.metrics_cache import MetricsCache
+    from src.pass_networks.pass_network import calculate_metrics
+
+    G = nx.karate_club_graph()
+    metrics = {
+        'density': nx.density,
+        'clustering': partial(nx.average_clustering, weight='weight'),
+        'betweenness': nx.betweenness_centrality,
+        'closeness': nx.closeness_centrality,
+        'path_length': nx.average_shortest_path_length,
+    }
+    cache = MetricsCache(sys.argv[1])
+    calculate_metrics(G, metrics, cache)
+    cache.close()
+    print(json.dumps({'hits': cache.hits, 'misses': cache.misses}))
+''')
+
+
+def _session(path):
+    output = subprocess.run(
+        [sys.executable, '-c', SESSION, path], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_persistent_cache_hits_in_a_new_process(tmp_path):
+    path = str(tmp_path / 'metrics.sqlite')
+    assert _session(path) == {'hits': 0, 'misses': 5}
+    assert _session(path) == {'hits': 5, 'misses': 0}
+
+
+def test_metric_params_is_stable_and_tells_functions_apart():
+    assert metric_params(nx.average_clustering) == metric_params(nx.average_clustering)
+    assert '0x' not in metric_params(nx.betweenness_centrality)
+    assert metric_params(lambda G: 1) != metric_params(lambda G: 2)
+    assert metric_params(partial(nx.average_clustering, weight='weight')) != metric_params(nx.average_clustering)
+    assert metric_params(nx.density, version='2') != metric_params(nx.density)
+
+
+def test_fingerprint_includes_edge_attributes():
+    G1 = nx.Graph()
+    G1.add_edge(0, 1, distance=1.0)
+    G1.add_edge(1, 2, distance=2.0)
+    G2 = nx.Graph()
+    G2.add_edge(0, 1, distance=1.0)
+    G2.add_edge(1, 2, distance=3.0)
+    assert graph_fingerprint(G1) != graph_fingerprint(G2)
+
+    cache = MetricsCache()
+    metric = {'size': partial(nx.Graph.size, weight='distance')}
+    assert calculate_metrics(G1, metric, cache) == {'size': 3.0}
+    assert calculate_metrics(G2, metric, cache) == {'size': 4.0}
@@ -0,0 +1,69 @@
+import math
+from collections import deque
+
+
+class RollingStatistics:
+    """
+    Estatísticas móveis (média, variância e EWMA) calculadas online.
+
+    A média e a variância da janela são mantidas pelo algoritmo de Welford adaptado
+    para janela deslizante, com um buffer circular de tamanho fixo: cada atualização
+    custa O(1) e a memória é O(window).
+
+    :param window: Tamanho da janela deslizante.
+    :param ewma_alpha: Fator de suavização da média móvel exponencial (0 < alpha <= 1).
+    """
+
+    def __init__(self, window=4, ewma_alpha=0.5):
+        if window < 1:
+            raise ValueError("window deve ser maior ou igual a 1.")
+        self.window = window
+        self.ewma_alpha = ewma_alpha
+        self.values = deque(maxlen=window)
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.ewma = None
+
+    def __len__(self):
+        return len(self.values)
+
+    def update(self, x):
+        """Adiciona um novo valor, descartando o mais antigo se a janela estiver cheia."""
+        x = float(x)
+        n = len(self.values)
+
+        if n == self.window:
+            old = self.values[0]
+            delta = x - old
+            old_mean = self.mean
+            self.mean += delta / n
+            self._m2 += delta * (x - self.mean + old - old_mean)
+        else:
+            delta = x - self.mean
+            self.mean += delta / (n + 1)
+            self._m2 += delta * (x - self.mean)
+
+        self.values.append(x)
+        self.count += 1
+        self._m2 = max(self._m2, 0.0)
+
+        if self.ewma is None:
+            self.ewma = x
+        else:
+            self.ewma = self.ewma_alpha * x + (1 - self.ewma_alpha) * self.ewma
+
+        return self
+
+    @property
+    def var(self):
+        """Variância populacional da janela (mesma convenção de numpy.std)."""
+        n = len(self.values)
+        return self._m2 / n if n > 0 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.var)
+
+    def get(self):
+        return {'mean': self.mean, 'var': self.var, 'ewma': self.ewma}